@@ -0,0 +1,174 @@
+# offline benchmark suite with regression baselines
+# fixed seeds and a fixed corpus of spots, so runs on the same machine are comparable
+#
+#   python bench.py                               run everything, print throughput
+#   python bench.py --out results.json            also save the results
+#   python bench.py --save-baseline               store results as the baseline (bench_baseline.json)
+#   python bench.py --check --threshold 0.25      exit 1 if any case is >25% slower than the baseline
+#   python bench.py --only rank7 --repeat 5       subset of cases, best of 5 runs
+#
+# every case reports ops/sec (hands, runouts, combos or deals per second), higher is better
+# baselines are machine specific, save one per box before comparing
+
+from typing import Callable, Dict, List, Optional, Tuple
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+
+from cards import make_deck, deal, parse_card
+from hand_rank5 import rank5
+from hand_rank7 import rank7
+from equity_hu import enumerate_runouts
+from ranges import range_to_combos
+
+DEFAULT_BASELINE = "bench_baseline.json"
+SEED = 1234
+
+def H(*ss):
+    return [parse_card(s) for s in ss]
+
+# (hero, villain, board, calls per run) by number of unknown board cards
+SPOTS = {
+    0: (H("Ah","Qh"), H("Jd","Js"), H("Jh","7c","2h","9s","3d"), 2000),
+    1: (H("Ah","Qh"), H("Jd","9d"), H("Jh","7c","2h","9s"), 200),
+    2: (H("Ah","Qh"), H("Jd","9d"), H("Jh","7c","2h"), 10),
+    5: (H("As","Kd"), H("Qh","Qs"), [], 1),
+}
+
+LARGE_RANGE = ["22+", "A2s+", "K2s+", "Q5s+", "J7s+", "T7s+", "97s+", "86s+", "75s+", "64s+", "54s",
+               "A2o+", "K8o+", "Q9o+", "J9o+", "T9o"]
+
+def _hands(n: int, k: int) -> List[list]:
+    rng = random.Random(SEED)
+    deck = make_deck()
+    return [rng.sample(deck, k) for _ in range(n)]
+
+def _case_rank5(scale: float) -> Tuple[Callable[[], None], int]:
+    hands = _hands(int(20_000 * scale) or 1, 5)
+    return lambda: [rank5(h) for h in hands], len(hands)
+
+def _case_rank7(scale: float) -> Tuple[Callable[[], None], int]:
+    hands = _hands(int(20_000 * scale) or 1, 7)
+    return lambda: [rank7(h) for h in hands], len(hands)
+
+def _case_runouts(need: int) -> Callable[[float], Tuple[Callable[[], None], int]]:
+    def make(scale: float) -> Tuple[Callable[[], None], int]:
+        hero, villain, board, calls = SPOTS[need]
+        calls = max(1, int(calls * scale)) if need < 5 else 1
+        total = math.comb(48 - len(board), need)
+        def run():
+            for _ in range(calls):
+                enumerate_runouts(hero, villain, board, allow_large=True)
+        return run, calls * total
+    return make
+
+def _case_range(scale: float) -> Tuple[Callable[[], None], int]:
+    n = int(50 * scale) or 1
+    board = H("Jh","7c","2h")
+    combos = len(range_to_combos(LARGE_RANGE, exclude=board))
+    return lambda: [range_to_combos(LARGE_RANGE, exclude=board) for _ in range(n)], n * combos
+
+def _case_deal(scale: float) -> Tuple[Callable[[], None], int]:
+    n = int(20_000 * scale) or 1
+    deck = make_deck()
+    def run():
+        rng = random.Random(SEED)
+        for _ in range(n):
+            deal(deck, 7, rng=rng)
+    return run, n
+
+# name -> (factory(scale) -> (run, ops per run), unit)
+CASES: Dict[str, Tuple[Callable[[float], Tuple[Callable[[], None], int]], str]] = {
+    "rank5": (_case_rank5, "hands"),
+    "rank7": (_case_rank7, "hands"),
+    "runouts_0": (_case_runouts(0), "runouts"),
+    "runouts_1": (_case_runouts(1), "runouts"),
+    "runouts_2": (_case_runouts(2), "runouts"),
+    "runouts_5": (_case_runouts(5), "runouts"),
+    "range_to_combos": (_case_range, "combos"),
+    "deal": (_case_deal, "deals"),
+}
+
+def run_case(name: str, *, repeat: int = 3, scale: float = 1.0) -> Dict[str, float]:
+    #best of `repeat` timed runs after one warmup (tables, caches)
+    factory, unit = CASES[name]
+    run, ops = factory(scale)
+    run()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return {"ops": ops, "unit": unit, "seconds": best, "ops_per_sec": ops / best if best > 0 else float("inf")}
+
+def run_all(names: Optional[List[str]] = None, *, repeat: int = 3, scale: float = 1.0, log=None) -> Dict:
+    results = {}
+    for name in names or list(CASES):
+        if name not in CASES:
+            raise ValueError(f"Unknown benchmark '{name}', expected one of {list(CASES)}")
+        results[name] = run_case(name, repeat=repeat, scale=scale)
+        if log is not None:
+            r = results[name]
+            print(f"{name:18s} {r['ops_per_sec']:>14,.0f} {r['unit']}/sec  ({r['seconds']:.3f}s)", file=log)
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": SEED,
+        "scale": scale,
+        "results": results,
+    }
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    #regressions: cases whose throughput fell more than `threshold` (fraction) below the baseline
+    out = []
+    for name, base in baseline.get("results", {}).items():
+        cur = current.get("results", {}).get(name)
+        if cur is None:
+            continue
+        floor = base["ops_per_sec"] * (1.0 - threshold)
+        if cur["ops_per_sec"] < floor:
+            drop = 1.0 - cur["ops_per_sec"] / base["ops_per_sec"]
+            out.append(f"{name}: {cur['ops_per_sec']:,.0f} {cur['unit']}/sec vs baseline {base['ops_per_sec']:,.0f} ({drop:.0%} slower)")
+    return out
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark evaluators, equity and range parsing.")
+    parser.add_argument("--only", nargs="+", choices=list(CASES), help="cases to run")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case, best one counts")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply corpus sizes")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--check", action="store_true", help="fail when a case regresses past --threshold")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown as a fraction")
+    args = parser.parse_args(argv)
+    if args.check and not args.save_baseline and not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}, run --save-baseline first", file=sys.stderr)
+        return 2
+
+    current = run_all(args.only, repeat=args.repeat, scale=args.scale, log=sys.stdout)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(current, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"saved baseline to {args.baseline}")
+    if args.check:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print("no regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,10 @@
 #   - card is tuple (rank, suit)
 #   - rank has values {2,... 14} where 14 = ace
 #   - suit is {s, h, d, c} for spades, hearts, diamonds, clubs
+# integer cards (for hot loops)
+#   - card int is (rank - 2) * 4 + suit index, so 0..51 follows make_deck order
+#   - sets of cards are 52-bit masks with bit i set for card int i
+#   - a 2-card combo {a, b} with a < b has index b*(b-1)/2 + a in 0..1325
 
 from typing import List, Tuple, Iterable, Sequence, Optional
 import random
@@ -15,6 +19,11 @@ VAL_TO_RANK = {v: r for r, v in RANK_TO_VAL.items()}
 
 Card = Tuple[int, str]  # (rank, suit)
 
+FULL_DECK_MASK = (1 << 52) - 1
+
+_INT_TO_CARD: List[Card] = [(v, su) for v in range(2, 15) for su in SUITS]
+_CARD_TO_INT = {card: i for i, card in enumerate(_INT_TO_CARD)}
+
 #parsing card strings into tuple
 def parse_card(card_str: str) -> Card:
     if not isinstance(card_str, str):
@@ -28,6 +37,17 @@ def parse_card(card_str: str) -> Card:
         raise ValueError(f"Bad suit in '{card_str}'")
     return (RANK_TO_VAL[r], su)
 
+#parse several cards, either a list of card strings or one string like "AhKd"
+def parse_cards(value) -> List[Card]:
+    if isinstance(value, str):
+        value = value.replace(" ", "").replace(",", "")
+        if len(value) % 2:
+            raise ValueError(f"Bad card string '{value}'")
+        value = [value[i:i + 2] for i in range(0, len(value), 2)]
+    if not isinstance(value, (list, tuple)):
+        raise ValueError(f"Expected card strings, got {type(value).__name__}")
+    return [parse_card(s) for s in value]
+
 #format tuple back to string
 def card_str(card: Card) -> str:
     v, su = card
@@ -38,14 +58,12 @@ def card_str(card: Card) -> str:
 #create deck
 def make_deck(exclude: Iterable[Card] = ()) -> List[Card]:
     #exclude is for excluding cards on the table
-    excl = set(exclude)
-    deck: List[Card] = []
-    for v in range(2, 15):
-        for su in SUITS:
-            card = (v, su)
-            if card not in excl:
-                deck.append(card)
-    return deck
+    excl = 0
+    for card in exclude:
+        i = _CARD_TO_INT.get(card)
+        if i is not None:
+            excl |= 1 << i
+    return [_INT_TO_CARD[i] for i in range(52) if not excl >> i & 1]
 
 #draw n distinct cards without replacement and returning drawn cards and remaining deck
 def deal(deck: Sequence[Card], n: int, *, rng: Optional[random.Random] = None) -> Tuple[List[Card], List[Card]]:
@@ -56,8 +74,11 @@ def deal(deck: Sequence[Card], n: int, *, rng: Optional[random.Random] = None) -
     else:
         idxs = sorted(rng.sample(range(len(deck)), n))
 
+    taken = bytearray(len(deck))
+    for i in idxs:
+        taken[i] = 1
     drawn = [deck[i] for i in idxs]
-    remaining = [deck[i] for i in range(len(deck)) if i not in set(idxs)]
+    remaining = [c for c, t in zip(deck, taken) if not t]
     return drawn, remaining
 
 def shuffle_deck(*, rng: Optional[random.Random] = None) -> List[Card]:
@@ -70,3 +91,74 @@ def shuffle_deck(*, rng: Optional[random.Random] = None) -> List[Card]:
 
 def all_card_strings() -> List[str]:
     return [f"{VAL_TO_RANK[v]}{su}" for v in range(2, 15) for su in SUITS]
+
+# ---------- integer cards and bitmasks ----------
+
+def card_to_int(card: Card) -> int:
+    i = _CARD_TO_INT.get(card)
+    if i is None:
+        raise ValueError(f"Bad card {card}")
+    return i
+
+def int_to_card(i: int) -> Card:
+    if not 0 <= i < 52:
+        raise ValueError(f"Bad card int {i}")
+    return _INT_TO_CARD[i]
+
+def cards_to_ints(cards: Iterable[Card]) -> List[int]:
+    return [card_to_int(c) for c in cards]
+
+def ints_to_cards(ints: Iterable[int]) -> List[Card]:
+    return [int_to_card(i) for i in ints]
+
+def parse_card_int(card_str: str) -> int:
+    return _CARD_TO_INT[parse_card(card_str)]
+
+def int_card_str(i: int) -> str:
+    return card_str(int_to_card(i))
+
+def cards_to_mask(ints: Iterable[int]) -> int:
+    #duplicates collapse, callers that care compare popcount with the input length
+    mask = 0
+    for i in ints:
+        mask |= 1 << i
+    return mask
+
+def mask_to_ints(mask: int) -> List[int]:
+    #ascending card ints, same order as make_deck
+    out: List[int] = []
+    while mask:
+        low = mask & -mask
+        out.append(low.bit_length() - 1)
+        mask ^= low
+    return out
+
+def mask_size(mask: int) -> int:
+    return mask.bit_count()
+
+def make_deck_ints(exclude_mask: int = 0) -> List[int]:
+    return mask_to_ints(FULL_DECK_MASK & ~exclude_mask)
+
+def rank_of(i: int) -> int:
+    return (i >> 2) + 2
+
+def suit_of(i: int) -> str:
+    return SUITS[i & 3]
+
+NUM_COMBOS = 1326
+
+_INDEX_TO_COMBO: List[Tuple[int, int]] = [(a, b) for b in range(52) for a in range(b)]
+
+def combo_index(a: int, b: int) -> int:
+    #index of the 2-card combo of card ints a and b (any order)
+    if a == b or not (0 <= a < 52 and 0 <= b < 52):
+        raise ValueError(f"Bad combo ({a}, {b})")
+    if a > b:
+        a, b = b, a
+    return b * (b - 1) // 2 + a
+
+def index_to_combo(i: int) -> Tuple[int, int]:
+    #(low card int, high card int)
+    if not 0 <= i < NUM_COMBOS:
+        raise ValueError(f"Bad combo index {i}")
+    return _INDEX_TO_COMBO[i]
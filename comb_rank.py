@@ -0,0 +1,75 @@
+# ranking k-card combinations in itertools.combinations order
+# rank r is the r-th tuple combinations(pool, k) yields, so a runout space can be cut into
+# contiguous rank ranges (shards) that are enumerated independently and add up to the full run
+
+from itertools import combinations, islice
+from math import comb
+from typing import Iterator, List, Sequence, Tuple
+
+# binomials for n < 64 (decks are 52 cards), used by unrank_combination in hot loops
+_BINOM = [[comb(n, k) for k in range(65)] for n in range(65)]
+
+def rank_combination(indices: Sequence[int], n: int) -> int:
+    #rank of a strictly increasing index tuple among combinations(range(n), len(indices))
+    k = len(indices)
+    r = 0
+    prev = -1
+    for i, x in enumerate(indices):
+        if not prev < x < n:
+            raise ValueError(f"Bad combination {tuple(indices)} for n={n}")
+        for y in range(prev + 1, x):
+            r += comb(n - y - 1, k - i - 1)
+        prev = x
+    return r
+
+def unrank_combination(n: int, k: int, r: int) -> Tuple[int, ...]:
+    #inverse of rank_combination
+    if not 0 <= r < comb(n, k):
+        raise ValueError(f"Rank {r} out of range for C({n}, {k})")
+    binom = _BINOM if n < 64 else None
+    out: List[int] = []
+    x = 0
+    for i in range(k):
+        while True:
+            c = binom[n - x - 1][k - i - 1] if binom else comb(n - x - 1, k - i - 1)
+            if r < c:
+                break
+            r -= c
+            x += 1
+        out.append(x)
+        x += 1
+    return tuple(out)
+
+def iter_combinations_slice(pool: Sequence, k: int, start: int, stop: int) -> Iterator[tuple]:
+    #combinations(pool, k) restricted to ranks [start, stop), one itertools block per leading card
+    n = len(pool)
+    stop = min(stop, comb(n, k))
+    if start >= stop:
+        return
+    if k == 0:
+        yield ()
+        return
+    offset = 0
+    for x in range(n - k + 1):
+        block = comb(n - x - 1, k - 1)
+        lo, hi = max(start - offset, 0), min(stop - offset, block)
+        if lo < hi:
+            head = (pool[x],)
+            for rest in islice(combinations(pool[x + 1:], k - 1), lo, hi):
+                yield head + rest
+        offset += block
+        if offset >= stop:
+            break
+
+def shard_bounds(total: int, shards: int) -> List[Tuple[int, int]]:
+    #split ranks [0, total) into `shards` contiguous ranges, sizes differ by at most one
+    if shards < 1:
+        raise ValueError("shards must be positive")
+    base, extra = divmod(total, shards)
+    out = []
+    start = 0
+    for i in range(shards):
+        stop = start + base + (1 if i < extra else 0)
+        out.append((start, stop))
+        start = stop
+    return out
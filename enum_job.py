@@ -0,0 +1,220 @@
+# checkpointed, sharded exhaustive heads-up enumeration
+#
+#   job = EnumJob(hero, villain, [], shards=256, path="akqq.json")   # resumes from akqq.json if it exists
+#   job.run(workers=8)                                              # only the shards not finished yet
+#   job.result()                                                    # same dict as equity_hu_exact
+#
+# the runout space combinations(deck, need) is cut into `shards` contiguous combination-rank ranges
+# (comb_rank.shard_bounds), shard i always covers the same runouts, so
+#   - counts of finished shards are saved to the checkpoint after each shard and skipped on resume
+#   - shards can run anywhere: run(only=...) on each machine, then merge_checkpoints the files
+#   - the finished totals are plain sums of disjoint slices, exactly the serial enumerate_runouts counts
+#
+# checkpoint file: JSON {"version": 1, "spec": {...}, "done": {"<shard>": [wins, ties, total], ...}}
+# written to a temp file and renamed, so an interrupted write leaves the previous checkpoint intact
+
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Tuple
+import argparse
+import json
+import math
+import os
+
+from cards import Card, card_str, parse_cards
+from comb_rank import shard_bounds
+from equity_hu import count_runout_slice, equity_from_counts, prepare_spot
+import instrument
+
+VERSION = 1
+
+Counts = Tuple[int, int, int]
+
+class EnumJob:
+    def __init__(self, hero_hole: List[Card], villain_hole: List[Card], board_partial: List[Card], *, shards: int = 64, path: Optional[str] = None, vectorized: bool = False):
+        #path=None keeps the finished shards in memory only
+        self.hero, self.villain, self.board, self.deck, self.need = prepare_spot(hero_hole, villain_hole, board_partial, True)
+        self.runouts = math.comb(len(self.deck), self.need)
+        self.bounds = shard_bounds(self.runouts, shards)
+        self.spec = {
+            "hero": [card_str(c) for c in hero_hole],
+            "villain": [card_str(c) for c in villain_hole],
+            "board": [card_str(c) for c in board_partial],
+            "shards": shards,
+            "runouts": self.runouts,
+        }
+        self.path = path
+        self.vectorized = vectorized
+        self.done: Dict[int, Counts] = {}
+        if path is not None and os.path.exists(path):
+            self._absorb(path)
+
+    @classmethod
+    def from_checkpoint(cls, path: str, *, vectorized: bool = False) -> "EnumJob":
+        #reopen a job from its checkpoint file alone
+        with open(path) as f:
+            spec = json.load(f)["spec"]
+        return cls(parse_cards(spec["hero"]), parse_cards(spec["villain"]), parse_cards(spec["board"]), shards=spec["shards"], path=path, vectorized=vectorized)
+
+    # ---- progress ----
+
+    @property
+    def shards(self) -> int:
+        return len(self.bounds)
+
+    def pending(self) -> List[int]:
+        return [i for i in range(self.shards) if i not in self.done]
+
+    def complete(self) -> bool:
+        return len(self.done) == self.shards
+
+    def run_shard(self, i: int) -> Counts:
+        #counts for shard i, computed here and not recorded
+        start, stop = self.bounds[i]
+        return count_runout_slice(self.hero, self.villain, self.board, self.deck, self.need, start, stop, self.vectorized)
+
+    def run(self, *, only: Optional[Iterable[int]] = None, workers: Optional[int] = None, pool: Optional[Executor] = None) -> int:
+        #run the pending shards (of `only`, if given), checkpointing each one, returns how many ran
+        todo = self.pending() if only is None else sorted(set(only) - set(self.done))
+        for i in todo:
+            if not 0 <= i < self.shards:
+                raise ValueError(f"Shard {i} out of range for {self.shards} shards")
+        if workers is None and pool is None:
+            for i in todo:
+                with instrument.phase("enumerate"):
+                    self._record(i, self.run_shard(i))
+            return len(todo)
+
+        if workers is not None and workers < 1:
+            raise ValueError("workers must be positive.")
+        own_pool = pool is None
+        if own_pool:
+            pool = ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = {
+                pool.submit(count_runout_slice, self.hero, self.villain, self.board, self.deck, self.need, *self.bounds[i], self.vectorized): i
+                for i in todo
+            }
+            for fut in as_completed(futures):
+                self._record(futures[fut], fut.result())
+        finally:
+            if own_pool:
+                pool.shutdown()
+        return len(todo)
+
+    def _record(self, i: int, counts: Counts) -> None:
+        self.done[i] = tuple(counts)
+        if instrument.active is not None:
+            instrument.active.count("runouts_scored", counts[2])
+            instrument.active.count("runouts_total", counts[2])
+        if self.path is not None:
+            self.save()
+
+    # ---- results ----
+
+    def counts(self) -> Dict[str, int]:
+        #summed counts of the finished shards (the full enumeration once complete)
+        wins = ties = total = 0
+        for w, t, n in self.done.values():
+            wins += w
+            ties += t
+            total += n
+        return {"wins": wins, "ties": ties, "total": total}
+
+    def result(self) -> Dict[str, float]:
+        if not self.complete():
+            raise ValueError(f"Job incomplete: {len(self.pending())} of {self.shards} shards pending")
+        c = self.counts()
+        if c["total"] != self.runouts:
+            raise ValueError(f"Shard totals add up to {c['total']}, expected {self.runouts}")
+        return equity_from_counts(c["wins"], c["ties"], c["total"])
+
+    # ---- checkpoints ----
+
+    def save(self, path: Optional[str] = None) -> None:
+        path = path or self.path
+        if path is None:
+            raise ValueError("No checkpoint path")
+        data = {"version": VERSION, "spec": self.spec, "done": {str(i): list(c) for i, c in sorted(self.done.items())}}
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def merge(self, other: "EnumJob") -> None:
+        #take over the finished shards of another run of the same job
+        self._merge_done(other.spec, other.done)
+
+    def _absorb(self, path: str) -> None:
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("version") != VERSION:
+            raise ValueError(f"{path}: unsupported checkpoint version {data.get('version')}")
+        self._merge_done(data["spec"], {int(i): tuple(c) for i, c in data["done"].items()}, path)
+
+    def _merge_done(self, spec: Dict, done: Dict[int, Counts], source: str = "other job") -> None:
+        if spec != self.spec:
+            raise ValueError(f"{source}: checkpoint is for a different job")
+        for i, counts in done.items():
+            if not 0 <= i < self.shards:
+                raise ValueError(f"{source}: shard {i} out of range")
+            if i in self.done and self.done[i] != counts:
+                raise ValueError(f"{source}: shard {i} counts {counts} disagree with {self.done[i]}")
+            self.done[i] = counts
+
+def merge_checkpoints(paths: Iterable[str], out: Optional[str] = None) -> EnumJob:
+    #one job holding the finished shards of every checkpoint (all for the same job), saved to out if given
+    paths = list(paths)
+    if not paths:
+        raise ValueError("No checkpoints to merge")
+    job = EnumJob.from_checkpoint(paths[0])
+    job.path = out
+    for p in paths[1:]:
+        job._absorb(p)
+    if out is not None:
+        job.save()
+    return job
+
+def _parse_shards(text: str) -> List[int]:
+    #"0-15,32,40-47" -> shard indices
+    out: List[int] = []
+    for part in text.split(","):
+        lo, _, hi = part.partition("-")
+        out.extend(range(int(lo), int(hi or lo) + 1))
+    return out
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Checkpointed, sharded heads-up enumeration.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    run = sub.add_parser("run", help="run (or resume) the pending shards of a job")
+    run.add_argument("checkpoint", help="checkpoint file, created if missing")
+    run.add_argument("--hero", help="hero hole cards, e.g. AhKh (not needed to resume)")
+    run.add_argument("--villain", help="villain hole cards")
+    run.add_argument("--board", default="", help="known board cards")
+    run.add_argument("--shards", type=int, default=64, help="number of shards of the runout space")
+    run.add_argument("--only", help="shards to run here, e.g. 0-31 (default: all pending)")
+    run.add_argument("--workers", type=int, help="worker processes")
+    run.add_argument("--vectorized", action="store_true", help="score runouts with NumPy")
+    merge = sub.add_parser("merge", help="merge checkpoints of the same job")
+    merge.add_argument("out", help="merged checkpoint file")
+    merge.add_argument("inputs", nargs="+", help="checkpoints to merge")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "run":
+        if args.hero is None and os.path.exists(args.checkpoint):
+            job = EnumJob.from_checkpoint(args.checkpoint, vectorized=args.vectorized)
+        elif args.hero is None or args.villain is None:
+            parser.error("--hero and --villain are required for a new job")
+        else:
+            job = EnumJob(parse_cards(args.hero), parse_cards(args.villain), parse_cards(args.board), shards=args.shards, path=args.checkpoint, vectorized=args.vectorized)
+        only = _parse_shards(args.only) if args.only else None
+        job.run(only=only, workers=args.workers)
+    else:
+        job = merge_checkpoints(args.inputs, args.out)
+
+    if job.complete():
+        print(json.dumps(job.result()))
+    else:
+        print(f"{len(job.done)}/{job.shards} shards done")
+
+if __name__ == "__main__":
+    main()
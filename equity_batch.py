@@ -0,0 +1,164 @@
+# batch heads-up equity over many (hero, villain, board) spots
+#
+#   python equity_batch.py spots.jsonl results.jsonl
+#
+# input: one JSON object per line
+#   {"id": 17, "hero": ["Ah", "Kh"], "villain": ["Qs", "Qd"], "board": ["Jh", "7c", "2h"]}
+#   cards may also be one string ("AhKh"), "id" is optional and copied to the output
+# output: one JSON object per input line, in input order
+#   {"id": 17, "equity": ..., "wins": ..., "ties": ..., "total": ...}  (same counts as equity_hu_exact)
+#   {"id": 17, "error": "..."}  for a bad line, the run carries on
+#
+# spots are read `window` at a time, so memory stays bounded whatever the input size
+# inside a window spots are grouped by board:
+#   - the deck and the runouts of the board are built once per group
+#   - each runout's board part (rank key, suit masks) is worked out once and every distinct
+#     hole-card combo of the group is scored against it (hand_rank7.rank_combos_ints)
+#   - a spot only counts the runouts that miss its own hole cards, so its counts are exact
+# boards with more than 2 unknown cards (allow_large) go spot by spot through equity_hu_exact,
+# where suit symmetry and the preflop table do more than sharing would
+
+from itertools import combinations, islice
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Tuple
+import argparse
+import json
+import sys
+
+from cards import Card, parse_cards, cards_to_ints, cards_to_mask, make_deck_ints
+from equity_hu import check_spot, equity_from_counts, equity_hu_exact
+from hand_rank7 import rank_combos_ints
+
+# spots held in memory at once
+DEFAULT_WINDOW = 10_000
+
+Spot = Dict[str, object]
+
+def _read_spot(spot: Spot) -> Tuple[List[Card], List[Card], List[Card]]:
+    hero = parse_cards(spot["hero"])
+    villain = parse_cards(spot["villain"])
+    board = parse_cards(spot.get("board", []))
+    check_spot(hero, villain, board, allow_large=True)
+    return hero, villain, board
+
+def _result(spot: Spot, res: Dict) -> Dict:
+    out = {"id": spot["id"]} if isinstance(spot, dict) and "id" in spot else {}
+    out.update(res)
+    return out
+
+def _count_group(board: List[int], spots: List[Tuple[int, List[int], List[int]]]) -> Dict[int, Tuple[int, int, int]]:
+    #(position, hero ints, villain ints) spots on one board -> position: (wins, ties, total)
+    need = 5 - len(board)
+    slot: Dict[int, int] = {}
+    combos: List[Tuple[int, int]] = []
+    combo_masks: List[int] = []
+    plan = []
+    for pos, hero, villain in spots:
+        ids = []
+        for hole in (hero, villain):
+            m = cards_to_mask(hole)
+            if m not in slot:
+                slot[m] = len(combos)
+                combos.append((hole[0], hole[1]))
+                combo_masks.append(m)
+            ids.append(slot[m])
+        plan.append((pos, ids[0], ids[1], combo_masks[ids[0]] | combo_masks[ids[1]], [0, 0, 0]))
+
+    values: List[int] = [0] * len(combos)
+    for drawn in combinations(make_deck_ints(cards_to_mask(board)), need):
+        dmask = cards_to_mask(drawn)
+        live = [i for i, m in enumerate(combo_masks) if not m & dmask]
+        for i, v in zip(live, rank_combos_ints(board + list(drawn), [combos[i] for i in live], packed=True)):
+            values[i] = v
+        for _, h, v, mask, acc in plan:
+            if mask & dmask:
+                continue
+            hv, vv = values[h], values[v]
+            if hv > vv:
+                acc[0] += 1
+            elif hv == vv:
+                acc[1] += 1
+            acc[2] += 1
+    return {pos: tuple(acc) for pos, _, _, _, acc in plan}
+
+def _solve_window(window: List[Spot], allow_large: bool) -> List[Dict]:
+    out: List[Optional[Dict]] = [None] * len(window)
+    groups: Dict[Tuple[int, ...], List[Tuple[int, List[int], List[int]]]] = {}
+    for pos, spot in enumerate(window):
+        try:
+            if isinstance(spot, _BadLine):
+                raise ValueError(spot.message)
+            if not isinstance(spot, dict):
+                raise ValueError(f"Expected a JSON object, got {type(spot).__name__}")
+            hero, villain, board = _read_spot(spot)
+            if len(board) < 3:
+                if not allow_large:
+                    raise ValueError("Cannot enumerate runouts with more than 2 unknown cards.")
+                out[pos] = _result(spot, equity_hu_exact(hero, villain, board, allow_large=True))
+                continue
+        except KeyError as e:
+            out[pos] = _result(spot, {"error": f"Missing field {e}"})
+            continue
+        except ValueError as e:
+            out[pos] = _result(spot, {"error": str(e)})
+            continue
+        key = tuple(sorted(cards_to_ints(board)))
+        groups.setdefault(key, []).append((pos, cards_to_ints(hero), cards_to_ints(villain)))
+
+    for key, members in groups.items():
+        for pos, counts in _count_group(list(key), members).items():
+            out[pos] = _result(window[pos], equity_from_counts(*counts))
+    return out
+
+def equity_batch(spots: Iterable[Spot], *, allow_large: bool = False, window: int = DEFAULT_WINDOW) -> Iterator[Dict]:
+    #one result per spot, in input order, see the top of the file for the formats
+    if window < 1:
+        raise ValueError("window must be positive")
+    it = iter(spots)
+    while True:
+        chunk = list(islice(it, window))
+        if not chunk:
+            return
+        yield from _solve_window(chunk, allow_large)
+
+class _BadLine:
+    #stands in for an unparsable input line so the output stays aligned with the input
+    def __init__(self, message: str):
+        self.message = message
+
+def _read_jsonl(lines: Iterable[str]) -> Iterator[Spot]:
+    for n, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            yield _BadLine(f"line {n}: bad JSON ({e.msg})")
+
+def run_jsonl(src: IO[str], dst: IO[str], *, allow_large: bool = False, window: int = DEFAULT_WINDOW) -> int:
+    #stream spots from src to results in dst, returns the number of lines written
+    n = 0
+    for res in equity_batch(_read_jsonl(src), allow_large=allow_large, window=window):
+        dst.write(json.dumps(res) + "\n")
+        n += 1
+    return n
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Heads-up equity for a JSON-lines file of spots.")
+    parser.add_argument("input", help="spots, one JSON object per line ('-' for stdin)")
+    parser.add_argument("output", nargs="?", default="-", help="results file ('-' for stdout)")
+    parser.add_argument("--allow-large", action="store_true", help="allow boards with fewer than 3 cards")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="spots held in memory at once")
+    args = parser.parse_args(argv)
+
+    src = sys.stdin if args.input == "-" else open(args.input)
+    dst = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        run_jsonl(src, dst, allow_large=args.allow_large, window=args.window)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+
+if __name__ == "__main__":
+    main()
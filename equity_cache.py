@@ -0,0 +1,210 @@
+# cache of equity results: bounded in-memory LRU, optional SQLite file behind it
+#
+#   cache = EquityCache(max_entries=100_000, path="equity_cache.sqlite")
+#   cache.equity_hu_exact(hero, villain, board)             # or set_result_cache(cache) in equity_hu
+#   cache.equity_range_vs_range("TT+, AQs+", "22+, AK", board)
+#   cache.stats()  ->  hits / misses (memory and disk), entries, approximate memory use
+#
+# keys are normalized so equivalent queries share one entry
+#   - heads-up: suit_iso.canonical_spot over (hero, villain, board), so card order and suit relabelings match;
+#     hero/villain are swapped into a fixed order and a swapped hit is mirrored (wins <-> villain wins)
+#   - ranges: ranges.normalize_range tokens and the sorted board, swapped the same way (range results keep
+#     the aggregate counts only, per_combo is not cached)
+# a hit returns a fresh dict, entries are stored as JSON text (that is also the memory estimate)
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+import json
+import sqlite3
+import sys
+
+from cards import Card, cards_to_ints, int_card_str
+from equity_range import equity_range_vs_range, equity_hand_vs_range
+from ranges import normalize_range
+from suit_iso import canonical_spot
+import equity_hu
+
+_COUNTS = ("equity", "wins", "ties", "total")
+
+def _cards_key(ints: Sequence[int]) -> str:
+    return "".join(int_card_str(c) for c in ints)
+
+def _mirror(res: Dict) -> Dict:
+    #the same matchup from villain's side
+    wins, ties, total = res["wins"], res["ties"], res["total"]
+    if not total:
+        return dict(res)
+    losses = total - wins - ties
+    return {"equity": (losses + 0.5 * ties) / total, "wins": losses, "ties": ties, "total": total}
+
+def _check_board(board_partial: List[Card], allow_large: bool) -> None:
+    #the board limits equity_range enforces, checked before the lookup so hits and misses agree
+    if len(board_partial) > 5:
+        raise ValueError("Board can have at most 5 cards.")
+    if 5 - len(board_partial) > 2 and not allow_large:
+        raise ValueError("Cannot enumerate runouts with more than 2 unknown cards.")
+
+class EquityCache:
+    def __init__(self, max_entries: int = 100_000, path: Optional[str] = None):
+        #path=None keeps the cache in memory only
+        if max_entries < 1:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self._lru: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self._db = sqlite3.connect(path)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._db.commit()
+
+    # ---- keys ----
+
+    @staticmethod
+    def hu_key(hero_hole: List[Card], villain_hole: List[Card], board_partial: List[Card]) -> Tuple[str, bool]:
+        #(key, swapped): swapped means the key has villain in hero's seat
+        hero, villain, board = cards_to_ints(hero_hole), cards_to_ints(villain_hole), cards_to_ints(board_partial)
+        straight = canonical_spot((hero, villain, board))
+        swapped = canonical_spot((villain, hero, board))
+        flip = swapped < straight
+        h, v, b = swapped if flip else straight
+        return f"hu:{_cards_key(h)}|{_cards_key(v)}|{_cards_key(b)}", flip
+
+    @staticmethod
+    def range_key(hero_range, villain_range, board_partial: List[Card]) -> Tuple[str, bool]:
+        hero, villain = ",".join(normalize_range(hero_range)), ",".join(normalize_range(villain_range))
+        board = _cards_key(sorted(cards_to_ints(board_partial)))
+        flip = villain < hero
+        if flip:
+            hero, villain = villain, hero
+        return f"range:{hero}|{villain}|{board}", flip
+
+    @staticmethod
+    def hand_range_key(hero_hole: List[Card], villain_range, board_partial: List[Card]) -> str:
+        hero = _cards_key(sorted(cards_to_ints(hero_hole)))
+        board = _cards_key(sorted(cards_to_ints(board_partial)))
+        return f"hand:{hero}|{','.join(normalize_range(villain_range))}|{board}"
+
+    # ---- tiers ----
+
+    def get(self, key: str) -> Optional[Dict]:
+        text = self._lru.get(key)
+        if text is not None:
+            self._lru.move_to_end(key)
+            self.memory_hits += 1
+            return json.loads(text)
+        if self._db is not None:
+            row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self.disk_hits += 1
+                self._remember(key, row[0])
+                return json.loads(row[0])
+        self.misses += 1
+        return None
+
+    def put(self, key: str, res: Dict) -> None:
+        text = json.dumps({k: res[k] for k in _COUNTS})
+        self._remember(key, text)
+        if self._db is not None:
+            self._db.execute("INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)", (key, text))
+            self._db.commit()
+
+    def _remember(self, key: str, text: str) -> None:
+        old = self._lru.pop(key, None)
+        if old is not None:
+            self._bytes -= sys.getsizeof(key) + sys.getsizeof(old)
+        self._lru[key] = text
+        self._bytes += sys.getsizeof(key) + sys.getsizeof(text)
+        while len(self._lru) > self.max_entries:
+            k, v = self._lru.popitem(last=False)
+            self._bytes -= sys.getsizeof(k) + sys.getsizeof(v)
+
+    # ---- equity_hu hook (see equity_hu.set_result_cache) ----
+
+    def lookup_hu(self, hero_hole: List[Card], villain_hole: List[Card], board_partial: List[Card]) -> Optional[Dict]:
+        key, flip = self.hu_key(hero_hole, villain_hole, board_partial)
+        res = self.get(key)
+        if res is None:
+            return None
+        return _mirror(res) if flip else res
+
+    def store_hu(self, hero_hole: List[Card], villain_hole: List[Card], board_partial: List[Card], res: Dict) -> None:
+        key, flip = self.hu_key(hero_hole, villain_hole, board_partial)
+        self.put(key, _mirror(res) if flip else res)
+
+    # ---- cached calls ----
+
+    def equity_hu_exact(self, hero_hole: List[Card], villain_hole: List[Card], board_partial: List[Card], **kwargs) -> Dict:
+        #equity_hu.equity_hu_exact through the cache, kwargs are passed on for misses
+        # categories=True results are never cached (only the counts are stored), those calls always enumerate
+        if kwargs.get("categories") or equity_hu.get_result_cache() is self:
+            return equity_hu.equity_hu_exact(hero_hole, villain_hole, board_partial, **kwargs)
+        equity_hu.check_spot(hero_hole, villain_hole, board_partial, allow_large=kwargs.get("allow_large", False))
+        res = self.lookup_hu(hero_hole, villain_hole, board_partial)
+        if res is None:
+            res = equity_hu.equity_hu_exact(hero_hole, villain_hole, board_partial, **kwargs)
+            self.store_hu(hero_hole, villain_hole, board_partial, res)
+        return res
+
+    def equity_range_vs_range(self, hero_range, villain_range, board_partial: List[Card], *, allow_large: bool = False) -> Dict:
+        _check_board(board_partial, allow_large)
+        key, flip = self.range_key(hero_range, villain_range, board_partial)
+        res = self.get(key)
+        if res is None:
+            res = equity_range_vs_range(hero_range, villain_range, board_partial, allow_large=allow_large)
+            res = {k: res[k] for k in _COUNTS}
+            self.put(key, _mirror(res) if flip else res)
+            return res
+        return _mirror(res) if flip else res
+
+    def equity_hand_vs_range(self, hero_hole: List[Card], villain_range, board_partial: List[Card], *, allow_large: bool = False) -> Dict:
+        _check_board(board_partial, allow_large)
+        key = self.hand_range_key(hero_hole, villain_range, board_partial)
+        res = self.get(key)
+        if res is None:
+            res = equity_hand_vs_range(hero_hole, villain_range, board_partial, allow_large=allow_large)
+            res = {k: res[k] for k in _COUNTS}
+            self.put(key, res)
+        return res
+
+    # ---- housekeeping ----
+
+    def stats(self) -> Dict[str, float]:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        out = {
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": len(self._lru),
+            "max_entries": self.max_entries,
+            "memory_bytes": self._bytes,
+        }
+        if self._db is not None:
+            out["disk_entries"] = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return out
+
+    def clear(self, *, disk: bool = False) -> None:
+        self._lru.clear()
+        self._bytes = 0
+        if disk and self._db is not None:
+            self._db.execute("DELETE FROM results")
+            self._db.commit()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __enter__(self) -> "EquityCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -3,12 +3,43 @@
 
 #hero_hole and villain_hole
 
-from typing import List, Tuple, Dict
-from itertools import combinations
+from typing import List, Tuple, Dict, Iterator, Optional
+from itertools import chain, combinations, islice
+from concurrent.futures import Executor, ProcessPoolExecutor
 import math
+import os
+import random
+import time
 
-from cards import make_deck, Card
-from hand_rank7 import rank7
+from cards import Card, cards_to_ints, cards_to_mask, int_to_card, make_deck_ints
+from hand_rank7 import rank7_ints, rank7_batch, rank_completions_ints, np
+from suit_iso import canonical_runouts
+from comb_rank import iter_combinations_slice, shard_bounds, unrank_combination
+from sampling import sample_from_deck, sample_array_from_deck
+import instrument
+
+# runouts scored per rank7_batch call when vectorized=True
+BATCH_SIZE = 1 << 16
+
+# preflop_table.PreflopTable used by equity_hu_exact for empty boards, see set_preflop_table
+_preflop_table = None
+
+def set_preflop_table(table) -> None:
+    #answer preflop equity_hu_exact queries from a loaded PreflopTable (None turns it off)
+    global _preflop_table
+    _preflop_table = table
+
+# equity_cache.EquityCache consulted by equity_hu_exact, see set_result_cache
+_result_cache = None
+
+def set_result_cache(cache) -> None:
+    #remember equity_hu_exact results in an EquityCache (None turns it off)
+    global _result_cache
+    _result_cache = cache
+
+def get_result_cache():
+    #the cache set with set_result_cache, or None
+    return _result_cache
 
 def _validate_inputs(hero_hole: List[Card], villain_hole: List[Card], board_partial: List[Card]):
     if len(hero_hole) != 2 or len(villain_hole) != 2:
@@ -19,56 +50,469 @@ def _validate_inputs(hero_hole: List[Card], villain_hole: List[Card], board_part
     if len(set(all_cards)) != len(all_cards):
         raise ValueError("All cards must be distinct.")
     
+def check_spot(hero_hole: List[Card], villain_hole: List[Card], board_partial: List[Card], *, allow_large: bool = False) -> None:
+    #the checks enumerate_runouts makes before enumerating: valid cards, and at most 2 unknown board cards unless allow_large
+    _validate_inputs(hero_hole, villain_hole, board_partial)
+    if 5 - len(board_partial) > 2 and not allow_large:
+        raise ValueError("Cannot enumerate runouts with more than 2 unknown cards.")
+
+def equity_from_counts(wins: int, ties: int, total: int) -> Dict[str, float]:
+    #the equity / wins / ties / total dict every exact result uses, ties count half
+    equity = (wins + 0.5 * ties) / total if total else 0.0
+    return {"equity": equity, "wins": wins, "ties": ties, "total": total}
+
 def _choose(n: int, k: int) -> int:
     if k < 0 or k > n:
         return 0
     return math.comb(n, k)
 
-def enumerate_runouts(hero_hole: List[Card], villain_hole: List[Card], board_partial: List[Card], *, allow_large: bool = False,) -> Dict[str, int]:
+def prepare_spot(hero_hole: List[Card], villain_hole: List[Card], board_partial: List[Card], allow_large: bool) -> Tuple[List[int], List[int], List[int], List[int], int]:
+    #validate and switch to integer cards: hero, villain, board, remaining deck, unknown board cards
+    with instrument.phase("validate"):
+        check_spot(hero_hole, villain_hole, board_partial, allow_large=allow_large)
+        need = 5 - len(board_partial)
+
+    with instrument.phase("deck"):
+        hero = cards_to_ints(hero_hole)
+        villain = cards_to_ints(villain_hole)
+        board = cards_to_ints(board_partial)
+        deck = make_deck_ints(cards_to_mask(hero + villain + board))
+    return hero, villain, board, deck, need
+
+def enumerate_runouts(hero_hole: List[Card], villain_hole: List[Card], board_partial: List[Card], *, allow_large: bool = False, vectorized: bool = False, symmetry: bool = True, workers: Optional[int] = None, pool: Optional[Executor] = None, categories: bool = False) -> Dict:
     #find how many cards still unknown in the board
     # build remaining deck
     # enumerate runouts for the remaining cards
     # score the runouts
     # return Win/ties/total count (equity is expected share of the pot, and ties are half)
     # equity is (wins + 0.5 * ties) / total
-    _validate_inputs(hero_hole, villain_hole, board_partial)
+    # vectorized=True scores the runouts in NumPy batches with rank7_batch (same counts)
+    # symmetry=True scores one runout per suit-isomorphism class and weights it (same counts, see suit_iso)
+    # workers=N (or a persistent pool=ProcessPoolExecutor) shards the plain combination space by rank
+    #   across processes and sums the counts, identical to the serial run (symmetry is not used there)
+    #   with pool=, workers still sets how many shards are cut (4 per worker, default os.cpu_count())
+    # the serial path is the last tally of iter_runouts
+    # categories=True also returns the final hand categories (rank5 category index, high card 0 .. straight flush 8),
+    #   read off the values already computed for the showdown, so no extra evaluations:
+    #   "hero_categories" / "villain_categories": 9 runout counts each
+    #   "category_matrix": 9x9, [hero category][villain category] -> [wins, ties, total]
+    #   (serial and vectorized paths, not with workers / pool)
+    hero, villain, board, deck, need = prepare_spot(hero_hole, villain_hole, board_partial, allow_large)
 
-    need = 5 - len(board_partial)
-    if need < 0:
-        raise ValueError("Board cannot have more than 5 cards.")
-    if need > 2 and not allow_large:
-        raise ValueError("Cannot enumerate runouts with more than 2 unknown cards.")
-    
-    used = hero_hole + villain_hole + board_partial
-    deck = make_deck(exclude=used)
+    if workers is not None or pool is not None:
+        if categories:
+            raise ValueError("categories=True is not supported with workers / pool.")
+        with instrument.phase("enumerate"):
+            return _enumerate_parallel(hero, villain, board, deck, need, workers, pool, vectorized)
+
+    if vectorized:
+        with instrument.phase("enumerate"):
+            return _enumerate_batched(hero, villain, board, _runouts(hero, villain, board, deck, need, symmetry, None), need, categories)
+
+    if categories:
+        with instrument.phase("enumerate"):
+            return _tally_categories(hero, villain, board, _runouts(hero, villain, board, deck, need, symmetry, None))
+
+    tally = {}
+    for tally in _tallies(hero, villain, board, deck, need, symmetry, None, chunk_size=None):
+        pass
+    return {"wins": tally["wins"], "ties": tally["ties"], "total": tally["total"]}
+
+def iter_runouts(hero_hole: List[Card], villain_hole: List[Card], board_partial: List[Card], *, allow_large: bool = False, symmetry: bool = True, rng: Optional[random.Random] = None, chunk_size: Optional[int] = 4096) -> Iterator[Dict[str, int]]:
+    #stream running counts: yields {"wins", "ties", "total", "runouts", "done"} every chunk_size runouts
+    # total is the runouts counted so far, runouts the size of the whole space, done once total == runouts
+    # chunk_size=None yields only the final tally
+    # with rng the runouts are visited in a random order (a random permutation of the space), so the
+    # counts after any prefix are a uniform sample without replacement: stop whenever, e.g. at a deadline,
+    # and (wins + 0.5 * ties) / total is an unbiased equity estimate. without rng the order is fixed
+    # (symmetry classes, see enumerate_runouts) and only the final tally is meaningful
+    hero, villain, board, deck, need = prepare_spot(hero_hole, villain_hole, board_partial, allow_large)
+    if chunk_size is not None and chunk_size < 1:
+        raise ValueError("chunk_size must be positive.")
+    return _tallies(hero, villain, board, deck, need, symmetry, rng, chunk_size)
+
+def iter_outcomes(hero_hole: List[Card], villain_hole: List[Card], board_partial: List[Card], *, allow_large: bool = False, symmetry: bool = True, rng: Optional[random.Random] = None) -> Iterator[Tuple[Tuple[Card, ...], int, int]]:
+    #per runout: (drawn cards, 1 hero wins / 0 tie / -1 villain wins, weight), same order rules as iter_runouts
+    hero, villain, board, deck, need = prepare_spot(hero_hole, villain_hole, board_partial, allow_large)
+    for drawn, w, _, _, result in _showdowns(hero, villain, board, _runouts(hero, villain, board, deck, need, symmetry, rng)):
+        yield tuple(int_to_card(c) for c in drawn), result, w
+
+def _showdowns(hero: List[int], villain: List[int], board: List[int], runouts, timing: Optional[List[float]] = None) -> Iterator[Tuple[Tuple[int, ...], int, int, int, int]]:
+    #the showdown of each (drawn cards, weight) runout: (drawn, weight, hero value, villain value, result)
+    # result is 1 hero wins / 0 tie / -1 villain wins, values are packed (value >> 20 is the category)
+    # every serial loop scores through here, so the showdown rule lives in one place
+    # timing=[0.0] adds the time spent evaluating to timing[0]
+    clock = time.perf_counter
+    for drawn, w in runouts:
+        if timing is not None:
+            t0 = clock()
+        full_board = board + list(drawn)
+        hero_best = rank7_ints(hero + full_board, packed=True)
+        villain_best = rank7_ints(villain + full_board, packed=True)
+        if timing is not None:
+            timing[0] += clock() - t0
+        yield drawn, w, hero_best, villain_best, (hero_best > villain_best) - (hero_best < villain_best)
+
+def _runouts(hero: List[int], villain: List[int], board: List[int], deck: List[int], need: int, symmetry: bool, rng: Optional[random.Random]) -> Iterator[Tuple[Tuple[int, ...], int]]:
+    #(drawn cards, weight) in the order iter_runouts documents
+    if rng is not None:
+        for r in _shuffled_ranks(math.comb(len(deck), need), rng):
+            yield tuple(deck[i] for i in unrank_combination(len(deck), need, r)), 1
+    elif symmetry:
+        yield from canonical_runouts((hero, villain, board), deck, need)
+    else:
+        for drawn in combinations(deck, need):
+            yield drawn, 1
+
+def _shuffled_ranks(n: int, rng: random.Random) -> Iterator[int]:
+    #uniformly random permutation of range(n), produced lazily by an incremental Fisher-Yates shuffle
+    # only displaced positions are stored (in a dict), so the first runouts cost O(1) each instead of
+    # shuffling the whole space up front
+    moved: Dict[int, int] = {}
+    randrange = rng.randrange
+    for i in range(n):
+        j = i + randrange(n - i)
+        vi = moved.pop(i, i)
+        if j == i:
+            yield vi
+            continue
+        yield moved.get(j, j)
+        moved[j] = vi
+
+def _tallies(hero: List[int], villain: List[int], board: List[int], deck: List[int], need: int, symmetry: bool, rng: Optional[random.Random], chunk_size: Optional[int]) -> Iterator[Dict[str, int]]:
+    if instrument.active is not None:
+        yield from _tallies_instrumented(hero, villain, board, deck, need, symmetry, rng, chunk_size, instrument.active)
+        return
+    space = math.comb(len(deck), need)
 
     #counts
     wins = ties = total = 0
+    seen = 0
+
+    #enumerate runouts, w is how many runouts this one stands for
+    for _, w, _, _, result in _showdowns(hero, villain, board, _runouts(hero, villain, board, deck, need, symmetry, rng)):
+        if result > 0:
+            wins += w
+        elif result == 0:
+            ties += w
+        total += w
+
+        seen += 1
+        if chunk_size is not None and seen == chunk_size and total < space:
+            seen = 0
+            yield {"wins": wins, "ties": ties, "total": total, "runouts": space, "done": False}
+
+    yield {"wins": wins, "ties": ties, "total": total, "runouts": space, "done": True}
+
+def _tallies_instrumented(hero: List[int], villain: List[int], board: List[int], deck: List[int], need: int, symmetry: bool, rng: Optional[random.Random], chunk_size: Optional[int], stats: instrument.Stats) -> Iterator[Dict[str, int]]:
+    #_tallies with phase timings and runout counters, only used while instrument.collect is on
+    # time spent by the consumer between yields is not counted
+    clock = time.perf_counter
+    space = math.comb(len(deck), need)
+    wins = ties = total = 0
+    seen = scored = 0
+    flushed = 0  # total already reported to stats
+    evaluate = [0.0]
+    start = clock()
+    for _, w, _, _, result in _showdowns(hero, villain, board, _runouts(hero, villain, board, deck, need, symmetry, rng), evaluate):
+        if result > 0:
+            wins += w
+        elif result == 0:
+            ties += w
+        total += w
+        scored += 1
+
+        seen += 1
+        if chunk_size is not None and seen == chunk_size and total < space:
+            seen = 0
+            _record_loop(stats, clock() - start, evaluate[0], scored, total - flushed)
+            scored, flushed, evaluate[0] = 0, total, 0.0
+            yield {"wins": wins, "ties": ties, "total": total, "runouts": space, "done": False}
+            start = clock()
+
+    _record_loop(stats, clock() - start, evaluate[0], scored, total - flushed)
+    yield {"wins": wins, "ties": ties, "total": total, "runouts": space, "done": True}
+
+def _tally_categories(hero: List[int], villain: List[int], board: List[int], runouts) -> Dict:
+    #the serial tally with the category counts of enumerate_runouts(categories=True)
+    # cells[(hc * 9 + vc) * 3 + k]: k = 0 wins, 1 ties, 2 total
+    cells = [0] * (81 * 3)
+    scored = 0
+    for _, w, hero_best, villain_best, result in _showdowns(hero, villain, board, runouts):
+        i = ((hero_best >> 20) * 9 + (villain_best >> 20)) * 3
+        if result > 0:
+            cells[i] += w
+        elif result == 0:
+            cells[i + 1] += w
+        cells[i + 2] += w
+        scored += 1
+    if instrument.active is not None:
+        instrument.active.count("rank7", 2 * scored)
+        instrument.active.count("runouts_scored", scored)
+        instrument.active.count("runouts_total", sum(cells[2::3]))
+    return _category_counts(cells)
 
-    #enumerate runouts
-    for drawn in combinations(deck, need):
-        full_board = board_partial + list(drawn)
+def _category_counts(cells: List[int]) -> Dict:
+    #flat (hero category, villain category, wins / ties / total) cells -> enumerate_runouts(categories=True) dict
+    matrix = [[cells[(h * 9 + v) * 3:(h * 9 + v) * 3 + 3] for v in range(9)] for h in range(9)]
+    return {
+        "wins": sum(cells[0::3]),
+        "ties": sum(cells[1::3]),
+        "total": sum(cells[2::3]),
+        "hero_categories": [sum(c[2] for c in matrix[h]) for h in range(9)],
+        "villain_categories": [sum(matrix[h][v][2] for h in range(9)) for v in range(9)],
+        "category_matrix": matrix,
+    }
 
-        hero_best = rank7(hero_hole + full_board)
-        villain_best = rank7(villain_hole + full_board)
+def _record_loop(stats: instrument.Stats, loop: float, evaluate: float, scored: int, runouts: int) -> None:
+    stats.add_time("enumerate", loop)
+    stats.add_time("evaluate", evaluate)
+    stats.count("rank7", 2 * scored)
+    stats.count("runouts_scored", scored)
+    stats.count("runouts_total", runouts)
 
-        if hero_best > villain_best:
+def _enumerate_batched(hero: List[int], villain: List[int], board: List[int], runouts, need: int, categories: bool = False) -> Dict:
+    #runouts yields (drawn cards, weight)
+    if np is None:
+        raise ImportError("vectorized=True requires numpy")
+    wins = ties = total = 0
+    cells = np.zeros(81 * 3, dtype=np.int64)
+    fixed_h = np.array(hero + board, dtype=np.int8)
+    fixed_v = np.array(villain + board, dtype=np.int8)
+    while True:
+        chunk = list(islice(runouts, BATCH_SIZE))
+        if not chunk:
+            break
+        n = len(chunk)
+        drawn = np.fromiter(chain.from_iterable(d for d, _ in chunk), dtype=np.int8, count=n * need).reshape(n, need)
+        weights = np.fromiter((w for _, w in chunk), dtype=np.int64, count=n)
+        with instrument.phase("evaluate"):
+            hero_vals = rank7_batch(np.hstack([np.broadcast_to(fixed_h, (n, len(fixed_h))), drawn]), packed=categories)
+            villain_vals = rank7_batch(np.hstack([np.broadcast_to(fixed_v, (n, len(fixed_v))), drawn]), packed=categories)
+        if categories:
+            base = ((hero_vals >> 20) * 9 + (villain_vals >> 20)) * 3
+            outcome = np.where(hero_vals > villain_vals, 0, 1)
+            cells += np.bincount(base + outcome, weights=weights * (hero_vals >= villain_vals), minlength=243).astype(np.int64)
+            cells += np.bincount(base + 2, weights=weights, minlength=243).astype(np.int64)
+        wins += int(weights[hero_vals > villain_vals].sum())
+        ties += int(weights[hero_vals == villain_vals].sum())
+        total += int(weights.sum())
+        if instrument.active is not None:
+            instrument.active.count("runouts_scored", n)
+            instrument.active.count("runouts_total", int(weights.sum()))
+    if categories:
+        return _category_counts(cells.tolist())
+    return {"wins": wins, "ties": ties, "total": total}
+
+def make_pool(workers: Optional[int] = None) -> ProcessPoolExecutor:
+    #process pool to keep around and pass as pool= to skip process startup on every query
+    return ProcessPoolExecutor(max_workers=workers)
+
+def count_runout_slice(hero: List[int], villain: List[int], board: List[int], deck: List[int], need: int, start: int, stop: int, vectorized: bool) -> Tuple[int, int, int]:
+    #counts for the runouts of combination ranks [start, stop), runs in a worker process
+    runouts = ((drawn, 1) for drawn in iter_combinations_slice(deck, need, start, stop))
+    if vectorized:
+        res = _enumerate_batched(hero, villain, board, runouts, need)
+        return res["wins"], res["ties"], res["total"]
+    wins = ties = total = 0
+    for _, _, _, _, result in _showdowns(hero, villain, board, runouts):
+        if result > 0:
             wins += 1
-        elif hero_best == villain_best:
+        elif result == 0:
             ties += 1
         total += 1
+    return wins, ties, total
+
+def _enumerate_parallel(hero: List[int], villain: List[int], board: List[int], deck: List[int], need: int, workers: Optional[int], pool: Optional[Executor], vectorized: bool) -> Dict[str, int]:
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be positive.")
+    # with a pool, workers only sizes the shards (default: one worker per CPU)
+    n_workers = workers or os.cpu_count() or 1
+    # a few shards per worker so uneven shards still balance
+    shards = shard_bounds(math.comb(len(deck), need), n_workers * 4)
 
+    own_pool = pool is None
+    if own_pool:
+        pool = ProcessPoolExecutor(max_workers=n_workers)
+    try:
+        futures = [
+            pool.submit(count_runout_slice, hero, villain, board, deck, need, start, stop, vectorized)
+            for start, stop in shards if start < stop
+        ]
+        wins = ties = total = 0
+        for fut in futures:
+            w, t, n = fut.result()
+            wins += w
+            ties += t
+            total += n
+        # evaluations happen in the workers, only the runouts are visible here
+        if instrument.active is not None:
+            instrument.active.count("runouts_scored", total)
+            instrument.active.count("runouts_total", total)
+    finally:
+        if own_pool:
+            pool.shutdown()
     return {"wins": wins, "ties": ties, "total": total}
 
-def equity_hu_exact(hero_hole: List[Card], villain_hole: List[Card], board_partial: List[Card], *, allow_large: bool = False) -> Dict[str, float]:
+def equity_hu_exact(hero_hole: List[Card], villain_hole: List[Card], board_partial: List[Card], *, allow_large: bool = False, vectorized: bool = False, symmetry: bool = True, workers: Optional[int] = None, pool: Optional[Executor] = None, categories: bool = False) -> Dict[str, float]:
     #calculate exact equity for 1v1 poker
-    counts = enumerate_runouts(hero_hole, villain_hole, board_partial, allow_large=allow_large)
-    
-    Wins, Ties, Total = counts["wins"], counts["ties"], counts["total"]
+    # categories=True adds the category counts of enumerate_runouts(categories=True), always enumerated
+    # preflop spots come straight from the preflop table when one is set and has the matchup
+    #   (they still need allow_large=True, like any empty-board call)
+    if categories:
+        counts = enumerate_runouts(hero_hole, villain_hole, board_partial, allow_large=allow_large, vectorized=vectorized, symmetry=symmetry, workers=workers, pool=pool, categories=True)
+        res = equity_from_counts(counts["wins"], counts["ties"], counts["total"])
+        res.update(counts)
+        return res
+    # both lookups make the same checks as an uncached call first, so the answer never depends on what is stored
+    if not board_partial and _preflop_table is not None:
+        check_spot(hero_hole, villain_hole, board_partial, allow_large=allow_large)
+        res = _preflop_table.lookup(hero_hole, villain_hole)
+        if res is not None:
+            return res
+    # repeated spots (any card order, suit relabeling or seat swap) come from the result cache when one is set
+    cache = _result_cache
+    if cache is not None:
+        check_spot(hero_hole, villain_hole, board_partial, allow_large=allow_large)
+        res = cache.lookup_hu(hero_hole, villain_hole, board_partial)
+        if res is not None:
+            return res
+    counts = enumerate_runouts(hero_hole, villain_hole, board_partial, allow_large=allow_large, vectorized=vectorized, symmetry=symmetry, workers=workers, pool=pool)
+    res = equity_from_counts(counts["wins"], counts["ties"], counts["total"])
+    if cache is not None:
+        cache.store_hu(hero_hole, villain_hole, board_partial, res)
+    return res
+
+def equity_hu_mc(hero_hole: List[Card], villain_hole: List[Card], board_partial: List[Card], *, rng: Optional[random.Random] = None, target_stderr: Optional[float] = None, max_samples: Optional[int] = 100_000, time_budget: Optional[float] = None, min_samples: int = 1_000, check_every: int = 1_000, z: float = 1.96, vectorized: bool = False) -> Dict[str, float]:
+    #monte carlo equity for 1v1 poker, any number of unknown board cards
+    # each sample deals the missing board cards from the remaining deck
+    # stops at the first of: stderr <= target_stderr (after min_samples), max_samples reached, time_budget seconds spent
+    # the stopping rules are checked every check_every samples
+    # same seeded rng gives the same result (unless time_budget cuts the run short)
+    # ci is equity +- z * stderr, clipped to [0, 1]
+    # runouts are drawn check_every at a time through sampling.py, vectorized=True draws them as a
+    # NumPy array (Generator seeded from rng) and scores them with rank7_batch
+    _validate_inputs(hero_hole, villain_hole, board_partial)
+    if target_stderr is None and max_samples is None and time_budget is None:
+        raise ValueError("Need at least one of target_stderr, max_samples or time_budget.")
+    if max_samples is not None and max_samples < 1:
+        raise ValueError("max_samples must be positive.")
+    if check_every < 1:
+        raise ValueError("check_every must be positive.")
+    if rng is None:
+        rng = random.Random()
+    if vectorized and np is None:
+        raise ImportError("vectorized=True requires numpy")
+    gen = np.random.default_rng(rng.getrandbits(64)) if vectorized else None
+
+    need = 5 - len(board_partial)
+    hero = cards_to_ints(hero_hole)
+    villain = cards_to_ints(villain_hole)
+    board = cards_to_ints(board_partial)
+    deck = make_deck_ints(cards_to_mask(hero + villain + board))
+    hero_fixed = tuple(hero + board)
+    villain_fixed = tuple(villain + board)
+
+    wins = ties = total = 0
+    start = time.perf_counter()
+    while True:
+        # a full board has one runout, nothing to sample
+        batch = check_every if need else 1
+        if max_samples is not None:
+            batch = min(batch, max_samples - total)
+        if gen is not None:
+            drawn = sample_array_from_deck(deck, need, batch, gen)
+            hero_vals = rank7_batch(np.hstack([np.tile(np.array(hero_fixed, dtype=np.int8), (batch, 1)), drawn]))
+            villain_vals = rank7_batch(np.hstack([np.tile(np.array(villain_fixed, dtype=np.int8), (batch, 1)), drawn]))
+            wins += int(np.count_nonzero(hero_vals > villain_vals))
+            ties += int(np.count_nonzero(hero_vals == villain_vals))
+        else:
+            samples = ((drawn, 1) for drawn in sample_from_deck(deck, need, batch, rng))
+            for _, _, _, _, result in _showdowns(hero, villain, board, samples):
+                if result > 0:
+                    wins += 1
+                elif result == 0:
+                    ties += 1
+        total += batch
+
+        if need == 0:
+            break
+        if max_samples is not None and total >= max_samples:
+            break
+        if time_budget is not None and time.perf_counter() - start >= time_budget:
+            break
+        if target_stderr is not None and total >= min_samples and _mc_stderr(wins, ties, total) <= target_stderr:
+            break
+
+    if instrument.active is not None:
+        instrument.active.add_time("enumerate", time.perf_counter() - start)
+        # rank7_batch already counted the vectorized evaluations
+        if gen is None:
+            instrument.active.count("rank7", 2 * total)
+        instrument.active.count("runouts_scored", total)
+        instrument.active.count("runouts_total", total)
+
+    equity = (wins + 0.5 * ties) / total
+    stderr = 0.0 if need == 0 else _mc_stderr(wins, ties, total)
+    return {
+        "equity": equity,
+        "wins": wins,
+        "ties": ties,
+        "total": total,
+        "stderr": stderr,
+        "ci_low": max(0.0, equity - z * stderr),
+        "ci_high": min(1.0, equity + z * stderr),
+    }
+
+def _mc_stderr(wins: int, ties: int, total: int) -> float:
+    # each sample scores 1 (win), 0.5 (tie) or 0, stderr of the mean with sample variance
+    if total < 2:
+        return math.inf
+    mean = (wins + 0.5 * ties) / total
+    mean_sq = (wins + 0.25 * ties) / total
+    var = max(0.0, mean_sq - mean * mean) * total / (total - 1)
+    return math.sqrt(var / total)
+
+def outs_breakdown(hero_hole: List[Card], villain_hole: List[Card], board_partial: List[Card]) -> Dict:
+    #results per next card: per river card on the turn, per turn card and per (turn, river) on the flop
+    # returns the equity_hu_exact counts plus
+    #   "cards": next card -> {"equity", "wins", "ties", "total"} over the runouts starting with it
+    #   "pairs" (flop only): (turn, river) -> 1 hero wins / 0 tie / -1 villain wins, both card orders
+    # on the flop each turn's 6 cards per player are worked out once and shared by all its rivers,
+    # and every unordered turn/river pair is scored once
+    _validate_inputs(hero_hole, villain_hole, board_partial)
+    if len(board_partial) not in (3, 4):
+        raise ValueError("Outs breakdown needs a flop or a turn board.")
+    hero = cards_to_ints(hero_hole)
+    villain = cards_to_ints(villain_hole)
+    board = cards_to_ints(board_partial)
+    deck = make_deck_ints(cards_to_mask(hero + villain + board))
 
-    if Total == 0:
-        equity = 0.0
-    else: 
-        equity = (Wins + 0.5 * Ties) / Total
+    per_card = {c: [0, 0, 0] for c in deck}
+    wins = ties = 0
+    pairs: Dict[Tuple[Card, Card], int] = {}
+    turns = deck if len(board) == 3 else [None]
+    for i, turn in enumerate(turns):
+        known = board if turn is None else board + [turn]
+        rivers = deck if turn is None else deck[i + 1:]
+        hero_vals = rank_completions_ints(hero + known, rivers, packed=True)
+        villain_vals = rank_completions_ints(villain + known, rivers, packed=True)
+        for river, hv, vv in zip(rivers, hero_vals, villain_vals):
+            result = 1 if hv > vv else 0 if hv == vv else -1
+            wins += result == 1
+            ties += result == 0
+            for c in (river,) if turn is None else (turn, river):
+                acc = per_card[c]
+                acc[0] += result == 1
+                acc[1] += result == 0
+                acc[2] += 1
+            if turn is not None:
+                t, r = int_to_card(turn), int_to_card(river)
+                pairs[(t, r)] = pairs[(r, t)] = result
 
-    return {"equity": equity, "wins": Wins, "ties": Ties, "total": Total}
+    total = math.comb(len(deck), 5 - len(board))
+    res = equity_from_counts(wins, ties, total)
+    res["cards"] = {int_to_card(c): equity_from_counts(*acc) for c, acc in per_card.items()}
+    if len(board) == 3:
+        res["pairs"] = pairs
+    return res
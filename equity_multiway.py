@@ -0,0 +1,77 @@
+# multiway equity, 2 to 9 players
+# each runout's board is completed once and every player is scored against it once
+# the pot is split evenly among the players tied for the best hand, so a k-way tie gives each of them 1/k
+# exact enumeration when the runout count is small, monte carlo sampling otherwise
+
+from itertools import combinations
+from typing import Dict, List, Optional
+import math
+import random
+
+from cards import Card, cards_to_ints, cards_to_mask, make_deck_ints
+from hand_rank7 import rank_combos_ints
+
+MAX_PLAYERS = 9
+# exact enumeration up to this many runouts (a flop spot has at most C(45, 2) = 990)
+MAX_EXACT_RUNOUTS = 50_000
+# pot shares are kept as integers in units of 1/2520 (divisible by every tie size 1..9)
+_SHARE_UNIT = 2520
+
+def _validate_inputs(holes: List[List[Card]], board_partial: List[Card]):
+    if not 2 <= len(holes) <= MAX_PLAYERS:
+        raise ValueError(f"Need 2 to {MAX_PLAYERS} players.")
+    if any(len(h) != 2 for h in holes):
+        raise ValueError("Every player must have exactly 2 hole cards.")
+    if len(board_partial) > 5:
+        raise ValueError("Board can have at most 5 cards.")
+    all_cards = [c for h in holes for c in h] + list(board_partial)
+    if len(set(all_cards)) != len(all_cards):
+        raise ValueError("All cards must be distinct.")
+
+def equity_multiway(holes: List[List[Card]], board_partial: List[Card], *, max_exact: int = MAX_EXACT_RUNOUTS, samples: int = 100_000, rng: Optional[random.Random] = None) -> Dict:
+    #equity for every player
+    # exact when the runout count is <= max_exact, otherwise `samples` random runouts (seed with rng)
+    # per player: equity (expected pot share), wins (sole winner), ties (runouts split with others)
+    _validate_inputs(holes, board_partial)
+
+    hands = [cards_to_ints(h) for h in holes]
+    board = cards_to_ints(board_partial)
+    deck = make_deck_ints(cards_to_mask([c for h in hands for c in h] + board))
+    need = 5 - len(board)
+    n_runouts = math.comb(len(deck), need)
+
+    exact = n_runouts <= max_exact
+    if exact:
+        runouts = combinations(deck, need)
+    else:
+        if samples < 1:
+            raise ValueError("samples must be positive.")
+        if rng is None:
+            rng = random.Random()
+        runouts = (rng.sample(deck, need) for _ in range(samples))
+
+    n = len(hands)
+    wins = [0] * n
+    ties = [0] * n
+    shares = [0] * n
+    total = 0
+    for drawn in runouts:
+        full_board = board + list(drawn)
+        vals = rank_combos_ints(full_board, hands, packed=True)
+        best = max(vals)
+        winners = [i for i in range(n) if vals[i] == best]
+        if len(winners) == 1:
+            wins[winners[0]] += 1
+            shares[winners[0]] += _SHARE_UNIT
+        else:
+            share = _SHARE_UNIT // len(winners)
+            for i in winners:
+                ties[i] += 1
+                shares[i] += share
+        total += 1
+
+    players = [
+        {"equity": shares[i] / (_SHARE_UNIT * total), "wins": wins[i], "ties": ties[i]}
+        for i in range(n)
+    ]
+    return {"players": players, "total": total, "exact": exact}
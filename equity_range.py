@@ -0,0 +1,174 @@
+# hand vs range and range vs range equity (2 players)
+# ranges use the same tokens as ranges.parse_range_tokens
+#
+# every runout of the board is enumerated once:
+#   - each live combo (no card on the full board) is scored once and shared by all its matchups
+#   - villain scores are sorted so a hero combo's wins/ties come from two bisects
+#   - villain combos sharing a card with the hero combo are then taken back out (card removal)
+# every (hero combo, villain combo, runout) with 6 distinct cards counts once,
+# so per matchup the counts are exactly what equity_hu_exact gives for that pair
+#
+# equity_grid runs every hero combo (or hero's range) through that same single pass and folds the
+# per-combo counts into the 13x13 hand class grid (ranges.hand_class_index layout)
+
+from bisect import bisect_left, bisect_right
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple
+
+from cards import Card, card_to_int, cards_to_ints, cards_to_mask, make_deck_ints
+from equity_hu import equity_from_counts
+from hand_rank7 import rank_combos_ints
+from ranges import NUM_HAND_CLASSES, compile_range, hand_class_index, hand_class_name, range_to_combos
+
+Combo = Tuple[Card, Card]
+
+def _validate_board(board_partial: List[Card]) -> None:
+    if len(board_partial) > 5:
+        raise ValueError("Board can have at most 5 cards.")
+    if len(set(board_partial)) != len(board_partial):
+        raise ValueError("All cards must be distinct.")
+
+def equity_combos(hero_combos: List[Combo], villain_combos: List[Combo], board_partial: List[Card], *, allow_large: bool = False) -> Dict:
+    #equity of a list of hero combos against a list of villain combos
+    # combos touching the board are dropped, matchups sharing a card are skipped
+    # returns aggregate counts/equity plus per hero combo counts/equity
+    _validate_board(board_partial)
+    need = 5 - len(board_partial)
+    if need > 2 and not allow_large:
+        raise ValueError("Cannot enumerate runouts with more than 2 unknown cards.")
+
+    board = cards_to_ints(board_partial)
+    board_mask = cards_to_mask(board)
+
+    def live(combos: List[Combo]) -> List[Tuple[Combo, int, int, int]]:
+        #(combo, card a, card b, mask) for combos not blocked by the board, deduped
+        out = []
+        seen = set()
+        for combo in combos:
+            if len(combo) != 2:
+                raise ValueError("Each combo must have exactly 2 cards.")
+            a, b = card_to_int(combo[0]), card_to_int(combo[1])
+            m = (1 << a) | (1 << b)
+            if a == b or m & board_mask or m in seen:
+                continue
+            seen.add(m)
+            out.append((tuple(combo), a, b, m))
+        return out
+
+    heroes = live(hero_combos)
+    villains = live(villain_combos)
+
+    h_wins = [0] * len(heroes)
+    h_ties = [0] * len(heroes)
+    h_total = [0] * len(heroes)
+
+    deck = make_deck_ints(board_mask)
+    for drawn in combinations(deck, need):
+        full_board = board + list(drawn)
+        runout_mask = cards_to_mask(drawn)
+
+        #score every live combo once for this runout (board counts shared, see hand_rank7.rank_combos_ints)
+        live_v = [(a, b, m) for _, a, b, m in villains if not m & runout_mask]
+        if not live_v:
+            continue
+        live_h = [(i, a, b, m) for i, (_, a, b, m) in enumerate(heroes) if not m & runout_mask]
+        v_vals = rank_combos_ints(full_board, [(a, b) for a, b, _ in live_v], packed=True)
+        #hero combos that are also in villain's range reuse villain's score
+        scores = {m: val for (_, _, m), val in zip(live_v, v_vals)}
+        missing = [(a, b) for _, a, b, m in live_h if m not in scores]
+        for (a, b), val in zip(missing, rank_combos_ints(full_board, missing, packed=True)):
+            scores[1 << a | 1 << b] = val
+        h_vals = [scores[m] for _, _, _, m in live_h]
+
+        by_card: Dict[int, List[Tuple[int, int]]] = {}
+        for (a, b, m), val in zip(live_v, v_vals):
+            by_card.setdefault(a, []).append((val, m))
+            by_card.setdefault(b, []).append((val, m))
+        v_vals.sort()
+        n_live = len(v_vals)
+
+        for (i, a, b, m), hv in zip(live_h, h_vals):
+            lo = bisect_left(v_vals, hv)
+            hi = bisect_right(v_vals, hv)
+            wins, ties, total = lo, hi - lo, n_live
+
+            #take back villain combos that share a card with this hero combo
+            blocked = by_card.get(a, []) + [x for x in by_card.get(b, []) if not x[1] >> a & 1]
+            for val, _ in blocked:
+                total -= 1
+                if val < hv:
+                    wins -= 1
+                elif val == hv:
+                    ties -= 1
+
+            h_wins[i] += wins
+            h_ties[i] += ties
+            h_total[i] += total
+
+    per_combo: Dict[Combo, Dict[str, float]] = {}
+    for i, (combo, _, _, _) in enumerate(heroes):
+        per_combo[combo] = equity_from_counts(h_wins[i], h_ties[i], h_total[i])
+
+    res = equity_from_counts(sum(h_wins), sum(h_ties), sum(h_total))
+    res["per_combo"] = per_combo
+    return res
+
+def equity_range_vs_range(hero_range: List[str], villain_range: List[str], board_partial: List[Card], *, allow_large: bool = False) -> Dict:
+    #range tokens for both players, e.g. ["TT+", "AQs+"] vs ["22+", "A2s+", "KQ"]
+    hero_combos = range_to_combos(hero_range, exclude=board_partial)
+    villain_combos = range_to_combos(villain_range, exclude=board_partial)
+    return equity_combos(hero_combos, villain_combos, board_partial, allow_large=allow_large)
+
+def equity_hand_vs_range(hero_hole: List[Card], villain_range: List[str], board_partial: List[Card], *, allow_large: bool = False) -> Dict:
+    #one hero hand against a villain range
+    if len(hero_hole) != 2:
+        raise ValueError("Hero must have exactly 2 hole cards.")
+    if set(hero_hole) & set(board_partial):
+        raise ValueError("All cards must be distinct.")
+    villain_combos = range_to_combos(villain_range, exclude=list(hero_hole) + list(board_partial))
+    return equity_combos([tuple(hero_hole)], villain_combos, board_partial, allow_large=allow_large)
+
+def equity_grid(villain_range: List[str], board_partial: List[Card], *, hero_range: Optional[List[str]] = None, allow_large: bool = False) -> Dict:
+    #equity of every starting hand class against a villain range, all classes in one pass over the runouts
+    # hero_range (default: every hand) picks and weights hero's combos, "AK:0.5" weighs AK's combos by 0.5
+    # returns
+    #   "grid": 13 rows of 13 cells in hand_class_index layout (row * 13 + col), None for a class with no live combos
+    #     each cell: "hand", equity / wins / ties / total summed over its combos, "combos" (live combos counted)
+    #     and "weight" (their summed hero_range weight, equity is weighted by it)
+    #   "equity", "combos", "weight": the whole of hero's range, weighted the same way
+    _validate_board(board_partial)
+    hero = compile_range("random" if hero_range is None else hero_range).without(board_partial)
+    villain_combos = range_to_combos(villain_range, exclude=board_partial)
+    hero_combos = hero.combos()
+    res = equity_combos(hero_combos, villain_combos, board_partial, allow_large=allow_large)
+
+    #per class: wins, ties, total, combos, weight, weighted points, weighted total
+    acc = [[0, 0, 0, 0, 0.0, 0.0, 0.0] for _ in range(NUM_HAND_CLASSES)]
+    for combo, r in res["per_combo"].items():
+        if not r["total"]:
+            continue
+        w = hero.weight(*combo)
+        a = acc[hand_class_index(*combo)]
+        a[0] += r["wins"]
+        a[1] += r["ties"]
+        a[2] += r["total"]
+        a[3] += 1
+        a[4] += w
+        a[5] += w * (r["wins"] + 0.5 * r["ties"])
+        a[6] += w * r["total"]
+
+    cells: List[Optional[Dict]] = []
+    for i, (wins, ties, total, n, weight, points, w_total) in enumerate(acc):
+        if not n:
+            cells.append(None)
+            continue
+        cells.append({"hand": hand_class_name(i), "equity": points / w_total if w_total else 0.0,
+                      "wins": wins, "ties": ties, "total": total, "combos": n, "weight": weight})
+    points = sum(a[5] for a in acc)
+    w_total = sum(a[6] for a in acc)
+    return {
+        "grid": [cells[row * 13:row * 13 + 13] for row in range(13)],
+        "equity": points / w_total if w_total else 0.0,
+        "combos": sum(a[3] for a in acc),
+        "weight": sum(a[4] for a in acc),
+    }
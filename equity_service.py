@@ -0,0 +1,347 @@
+# long-running local equity service
+#
+#   python equity_service.py --port 8765            localhost TCP
+#   python equity_service.py --unix /tmp/pv.sock    unix socket
+#
+# protocol: JSON lines both ways, a response carries the request's "id" (responses can come back out of order)
+#   {"id": 1, "op": "equity", "hero": "AhKh", "villain": "QsQd", "board": "Jh7c2h"}
+#       -> {"id": 1, "equity": ..., "wins": ..., "ties": ..., "total": ...}
+#   {"id": 2, "op": "range", "hero_range": "TT+, AQs+", "villain_range": "22+, AK:0.5", "board": "Jh7c2h9s"}
+#       -> {"id": 2, "equity": ..., "wins": ..., "ties": ..., "total": ...}
+#   {"id": 3, "op": "metrics"}  -> request counts, batch sizes, latency percentiles, throughput
+#   errors come back as {"id": ..., "error": "..."}
+#
+# how it works
+#   - the process stays up, so imports, hand tables and the compiled range cache stay warm
+#   - equity requests on flops / turns / rivers are queued and micro-batched: whatever arrives within
+#     batch_delay (or is waiting while the pool is busy) goes to equity_batch together, so spots on the
+#     same board share their runouts and board evaluation
+#   - preflop spots and range requests are heavy and go one by one
+#   - all work runs on a worker pool (processes, tables warmed by the initializer), at most `workers` jobs in flight
+#
+# EquityClient is a small asyncio client, loadgen.py drives a running service for load tests
+
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import time
+
+from cards import parse_cards
+from equity_batch import equity_batch
+from equity_range import equity_range_vs_range
+from hand_rank5 import strength_of
+from hand_rank7 import rank7_ints
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+def _warm() -> None:
+    #build the lookup tables up front (pool initializer and service start)
+    rank7_ints(list(range(7)))
+    strength_of((0, 7, 5, 4, 3, 2))
+
+def _solve_spots(spots: List[Dict], allow_large: bool) -> List[Dict]:
+    return list(equity_batch(spots, allow_large=allow_large))
+
+def _solve_range(hero_range: Any, villain_range: Any, board: Any) -> Dict:
+    res = equity_range_vs_range(hero_range, villain_range, parse_cards(board))
+    res.pop("per_combo", None)
+    return res
+
+class ServiceMetrics:
+    def __init__(self, window: int = 10_000):
+        #latency percentiles are over the last `window` requests
+        self.started = time.monotonic()
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_spots = 0
+        self.heavy_jobs = 0
+        self.latencies: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float, ok: bool) -> None:
+        self.requests += 1
+        if not ok:
+            self.errors += 1
+        self.latencies.append(seconds)
+
+    def as_dict(self) -> Dict[str, float]:
+        uptime = time.monotonic() - self.started
+        lat = sorted(self.latencies)
+        pct = lambda p: lat[min(len(lat) - 1, int(p * len(lat)))] * 1000 if lat else 0.0
+        return {
+            "uptime": uptime,
+            "requests": self.requests,
+            "errors": self.errors,
+            "throughput": self.requests / uptime if uptime > 0 else 0.0,
+            "batches": self.batches,
+            "mean_batch": self.batched_spots / self.batches if self.batches else 0.0,
+            "heavy_jobs": self.heavy_jobs,
+            "latency_ms_p50": pct(0.50),
+            "latency_ms_p95": pct(0.95),
+            "latency_ms_p99": pct(0.99),
+        }
+
+class EquityService:
+    def __init__(self, *, workers: Optional[int] = None, max_batch: int = 256, batch_delay: float = 0.002, allow_large: bool = True):
+        #workers=0 runs jobs on one thread instead of a process pool (tests, debugging)
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.max_batch = max_batch
+        self.batch_delay = batch_delay
+        self.allow_large = allow_large
+        self.metrics = ServiceMetrics()
+        self._pool: Optional[Executor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._jobs: Set[asyncio.Task] = set()
+
+    async def start(self, *, host: str = DEFAULT_HOST, port: Optional[int] = DEFAULT_PORT, unix_path: Optional[str] = None) -> "EquityService":
+        #port=None and no unix_path: no listener, requests only through submit()
+        _warm()
+        if self.workers:
+            self._pool = ProcessPoolExecutor(self.workers, initializer=_warm)
+        else:
+            self._pool = ThreadPoolExecutor(1)
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(max(1, self.workers))
+        self._batcher = asyncio.create_task(self._batch_loop())
+        if unix_path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path=unix_path)
+        elif port is not None:
+            self._server = await asyncio.start_server(self._handle, host, port)
+        return self
+
+    @property
+    def address(self):
+        #(host, port) or the unix socket path
+        return self._server.sockets[0].getsockname() if self._server else None
+
+    async def serve_forever(self) -> None:
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+        if self._jobs:
+            await asyncio.gather(*self._jobs, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown()
+
+    async def submit(self, request: Dict) -> Dict:
+        #answer one request dict (the same objects the socket protocol carries)
+        start = time.perf_counter()
+        op = request.get("op", "equity")
+        if op == "metrics":
+            res = self.metrics.as_dict()
+        else:
+            try:
+                if op == "equity":
+                    res = await self._equity(request)
+                elif op == "range":
+                    res = await self._offload(_solve_range, request["hero_range"], request["villain_range"], request.get("board", []))
+                else:
+                    res = {"error": f"Unknown op '{op}'"}
+            except KeyError as e:
+                res = {"error": f"Missing field {e}"}
+            except ValueError as e:
+                res = {"error": str(e)}
+            except Exception as e:
+                # anything else (bad field types, a broken worker pool) still gets exactly one reply
+                res = {"error": f"{type(e).__name__}: {e}"}
+            self.metrics.record(time.perf_counter() - start, "error" not in res)
+        if "id" in request:
+            res = {"id": request["id"], **res}
+        return res
+
+    async def _equity(self, request: Dict) -> Dict:
+        spot = {"hero": request["hero"], "villain": request["villain"], "board": request.get("board", [])}
+        if len(parse_cards(spot["board"])) < 3:
+            return (await self._offload(_solve_spots, [spot], self.allow_large))[0]
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((spot, fut))
+        return await fut
+
+    async def _offload(self, func: Callable, *args) -> Any:
+        async with self._slots:
+            self.metrics.heavy_jobs += 1
+            return await asyncio.get_running_loop().run_in_executor(self._pool, func, *args)
+
+    async def _batch_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._slots.acquire()
+            # the pool was busy: take whatever queued up meanwhile
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            job = asyncio.create_task(self._run_batch(batch))
+            self._jobs.add(job)
+            job.add_done_callback(self._jobs.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Dict, asyncio.Future]]) -> None:
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self._pool, _solve_spots, [s for s, _ in batch], False)
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+        self.metrics.batches += 1
+        self.metrics.batched_spots += len(batch)
+        for (_, fut), res in zip(batch, results):
+            if not fut.done():
+                fut.set_result(res)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        lock = asyncio.Lock()
+        pending: Set[asyncio.Task] = set()
+
+        async def reply(res: Dict) -> None:
+            async with lock:
+                writer.write((json.dumps(res) + "\n").encode())
+                await writer.drain()
+
+        async def answer(req: Dict) -> None:
+            await reply(await self.submit(req))
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    req = json.loads(line)
+                except json.JSONDecodeError as e:
+                    await reply({"error": f"bad JSON ({e.msg})"})
+                    continue
+                if not isinstance(req, dict):
+                    await reply({"error": "Expected a JSON object"})
+                    continue
+                task = asyncio.create_task(answer(req))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+class EquityClient:
+    #asyncio client, requests can be pipelined from several tasks on one connection
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count()
+        self._waiting: Dict[int, asyncio.Future] = {}
+        self._listener = asyncio.create_task(self._listen())
+
+    @classmethod
+    async def connect(cls, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, *, unix_path: Optional[str] = None) -> "EquityClient":
+        if unix_path is not None:
+            reader, writer = await asyncio.open_unix_connection(unix_path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, payload: Dict) -> Dict:
+        #send one request, "id" is set by the client and stripped from the response
+        rid = next(self._ids)
+        fut = asyncio.get_running_loop().create_future()
+        self._waiting[rid] = fut
+        self._writer.write((json.dumps({**payload, "id": rid}) + "\n").encode())
+        await self._writer.drain()
+        res = await fut
+        res.pop("id", None)
+        return res
+
+    async def equity(self, hero: Any, villain: Any, board: Any = ()) -> Dict:
+        return await self.request({"op": "equity", "hero": hero, "villain": villain, "board": list(board) if not isinstance(board, str) else board})
+
+    async def range_equity(self, hero_range: Any, villain_range: Any, board: Any) -> Dict:
+        return await self.request({"op": "range", "hero_range": hero_range, "villain_range": villain_range, "board": board})
+
+    async def metrics(self) -> Dict:
+        return await self.request({"op": "metrics"})
+
+    async def close(self) -> None:
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        self._listener.cancel()
+
+    async def _listen(self) -> None:
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                res = json.loads(line)
+                fut = self._waiting.pop(res.get("id"), None)
+                if fut is not None and not fut.done():
+                    fut.set_result(res)
+        finally:
+            for fut in self._waiting.values():
+                if not fut.done():
+                    fut.set_exception(ConnectionError("equity service closed the connection"))
+            self._waiting.clear()
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Local heads-up / range equity service (JSON lines).")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="listen on this unix socket path instead of TCP")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count, 0 = one thread)")
+    parser.add_argument("--max-batch", type=int, default=256, help="most spots per batch")
+    parser.add_argument("--batch-delay-ms", type=float, default=2.0, help="how long a batch waits for more spots")
+    args = parser.parse_args(argv)
+
+    async def run() -> None:
+        service = EquityService(workers=args.workers, max_batch=args.max_batch, batch_delay=args.batch_delay_ms / 1000)
+        await service.start(host=args.host, port=args.port, unix_path=args.unix)
+        print(f"equity service listening on {service.address}", flush=True)
+        try:
+            await service.serve_forever()
+        finally:
+            await service.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,22 @@
-# hand category 
+# hand category
 # 0 to 8, high card to straight flush (royal flush is the best straight flush)
+#
+# rank5 is a lookup evaluator over the 7462 hand classes
+#   - flush: 13-bit mask of the ranks (bit v-2 set for rank v) -> class
+#   - otherwise: product of one prime per rank, unique for every multiset of ranks -> class
+#   - strength is the class index (0 = 7-5-4-3-2, 7461 = royal flush) and orders hands exactly like the tuples
+#   - rank5 returns the category tuple, rank5_value the strength, strength_to_tuple / strength_of convert
+#   - rank5_reference is the original sort-and-count implementation, kept to check the tables against
+#
+# packed values
+#   - one int per hand: category << 20 | kicker1 << 16 | ... | kicker5 << 0, missing kickers are 0
+#   - every category has a fixed tuple length, so packed ints compare exactly like the tuples
+#   - they fit in 24 bits, so results can live in array("i") / int32 NumPy buffers and be sorted in bulk
+#   - pack_hand / unpack_hand convert, the evaluators return them with packed=True
+# the mask / straight / multiset helpers here are shared with the 7-card tables in hand_rank7
 
-from typing import List, Tuple
+from typing import Dict, Iterator, List, Tuple
+import instrument
 
 Card = Tuple[int, str]
 
@@ -9,11 +24,11 @@ Card = Tuple[int, str]
 def _straight_high(sorted_unique_vals_asc: List[int]) -> int | None:
     if len(sorted_unique_vals_asc) < 5:
         return None
-    
+
     seq = sorted_unique_vals_asc
     if 14 in seq and 1 not in seq:
         seq = [1] + seq
-    
+
     run = 1
     best_high = None
     for i in range(1, len(seq)):
@@ -26,10 +41,28 @@ def _straight_high(sorted_unique_vals_asc: List[int]) -> int | None:
     return best_high
 
 # evaluate 5-card hand
-def rank5(cards5: List[Card]) -> tuple:
+def rank5(cards5: List[Card], *, packed: bool = False):
     if len(cards5) != 5:
         raise ValueError("Expected exactly 5 cards")
-    
+    if instrument.active is not None:
+        instrument.active.count("rank5")
+    strength = _rank5_strength(cards5)
+    return _PACKED[strength] if packed else _CLASSES[strength]
+
+def rank5_value(cards5: List[Card]) -> int:
+    #strength of a 5-card hand, compares like rank5's tuples
+    if len(cards5) != 5:
+        raise ValueError("Expected exactly 5 cards")
+    if instrument.active is not None:
+        instrument.active.count("rank5")
+    return _rank5_strength(cards5)
+
+def rank5_reference(cards5: List[Card]) -> tuple:
+    if len(cards5) != 5:
+        raise ValueError("Expected exactly 5 cards")
+    if instrument.active is not None:
+        instrument.active.count("rank5")
+
     vals = [v for v, _ in cards5]
     suits = [s for _, s in cards5]
     vals_sorted_desc = sorted(vals, reverse=True)
@@ -46,48 +79,216 @@ def rank5(cards5: List[Card]) -> tuple:
     s_high = _straight_high(vals_unique_asc)
 
     #straight flush
-    if is_flush and s_high is not None: 
+    if is_flush and s_high is not None:
         return (8, s_high)
-    
+
     #4 of a kind
     if by_count[0][1] == 4:
         quad = by_count[0][0]
         kicker = max([v for v in vals_unique_desc if v != quad])
         return (7, quad, kicker)
-    
+
     # full house
     trips = [v for v, c in by_count if c == 3]
     pairs = [v for v, c in by_count if c == 2]
     if trips and pairs:
         return (6, trips[0], pairs[0])
-    
+
     # flush
     if is_flush:
         return (5, *vals_sorted_desc)
-    
+
     # straight
     if s_high is not None:
         return (4, s_high)
-    
+
     # 3 of a kind
     if by_count[0][1] == 3:
         t = by_count[0][0]
         kickers = [v for v in vals_unique_desc if v != t][:2]
         return (3, t, *kickers)
-    
+
     # 2 pair
     pairs_only =  [v for v, c in by_count if c == 2]
     if len(pairs_only) == 2:
         p1, p2 = sorted(pairs_only, reverse=True)
         kicker = [v for v in vals_unique_desc if v not in (p1, p2)][0]
         return (2, p1, p2, kicker)
-    
+
     # one pair
     if len(pairs_only) == 1:
         p = pairs_only[0]
         kickers = [v for v in vals_unique_desc if v != p][:3]
         return (1, p, *kickers)
-    
-    # high card 
+
+    # high card
     return (0, *vals_sorted_desc)
-    
+
+# ---------- rank masks and multisets (shared with hand_rank7) ----------
+
+def _straight_from_mask(mask: int) -> int:
+    #ace also plays low in the wheel
+    bits = (mask << 1) | (1 if mask & (1 << 12) else 0)
+    for high in range(14, 4, -1):
+        run = 0b11111 << (high - 5)
+        if bits & run == run:
+            return high
+    return 0
+
+_POPCOUNT: List[int] = [bin(m).count("1") for m in range(8192)]
+#straight high card for each 13-bit rank mask, 0 if none
+_STRAIGHT_HIGH: List[int] = [_straight_from_mask(m) for m in range(8192)]
+
+def _vals_desc(mask: int) -> List[int]:
+    return [v for v in range(14, 1, -1) if mask & (1 << (v - 2))]
+
+def _flush_hand(mask: int) -> tuple:
+    #best flush / straight flush from the ranks of one suit (5+ bits)
+    s_high = _STRAIGHT_HIGH[mask]
+    if s_high:
+        return (8, s_high)
+    return (5, *_vals_desc(mask)[:5])
+
+def _best_non_flush(counts: Dict[int, int]) -> tuple:
+    #counts maps rank -> number of cards of that rank (5 to 7 cards in total)
+    vals_desc = sorted(counts, reverse=True)
+
+    quads = [v for v in vals_desc if counts[v] == 4]
+    if quads:
+        q = quads[0]
+        kicker = max(v for v in vals_desc if v != q)
+        return (7, q, kicker)
+
+    trips = [v for v in vals_desc if counts[v] == 3]
+    pairs = [v for v in vals_desc if counts[v] == 2]
+    if trips:
+        # second trips can play as the pair of a full house
+        fill = trips[1:] + pairs
+        if fill:
+            return (6, trips[0], max(fill))
+
+    mask = 0
+    for v in vals_desc:
+        mask |= 1 << (v - 2)
+    s_high = _STRAIGHT_HIGH[mask]
+    if s_high:
+        return (4, s_high)
+
+    if trips:
+        t = trips[0]
+        kickers = [v for v in vals_desc if v != t][:2]
+        return (3, t, *kickers)
+
+    if len(pairs) >= 2:
+        p1, p2 = pairs[0], pairs[1]
+        kicker = [v for v in vals_desc if v not in (p1, p2)][0]
+        return (2, p1, p2, kicker)
+
+    if pairs:
+        p = pairs[0]
+        kickers = [v for v in vals_desc if v != p][:3]
+        return (1, p, *kickers)
+
+    return (0, *vals_desc[:5])
+
+def _rank_multisets(n: int, v: int = 2, counts: Dict[int, int] | None = None) -> Iterator[Dict[int, int]]:
+    #every multiset of n ranks with at most 4 of each rank, as rank -> count (the dict is reused, copy to keep)
+    if counts is None:
+        counts = {}
+    if n == 0:
+        yield counts
+        return
+    if v > 14:
+        return
+    for k in range(min(4, n), -1, -1):
+        if k:
+            counts[v] = k
+        yield from _rank_multisets(n - k, v + 1, counts)
+        counts.pop(v, None)
+
+# ---------- 5-card lookup tables ----------
+
+_PRIMES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41]  # rank 2 .. ace
+
+_CLASSES: List[tuple] = []
+_STRENGTH: Dict[tuple, int] = {}
+_PACKED: List[int] = []  # strength -> packed value
+_FLUSH5: List[int] = [-1] * 8192  # rank mask -> strength, for 5 suited cards
+_PRIME5: Dict[int, int] = {}  # prime product -> strength, for everything else
+
+def _build_tables() -> None:
+    flushes = {m: _flush_hand(m) for m in range(8192) if _POPCOUNT[m] == 5}
+    others = {}
+    for counts in _rank_multisets(5):
+        product = 1
+        for v, k in counts.items():
+            product *= _PRIMES[v - 2] ** k
+        others[product] = _best_non_flush(counts)
+
+    _CLASSES.extend(sorted(set(flushes.values()) | set(others.values())))
+    _STRENGTH.update((t, i) for i, t in enumerate(_CLASSES))
+    _PACKED.extend(pack_hand(t) for t in _CLASSES)
+    for m, t in flushes.items():
+        _FLUSH5[m] = _STRENGTH[t]
+    for product, t in others.items():
+        _PRIME5[product] = _STRENGTH[t]
+
+def _rank5_strength(cards5: List[Card]) -> int:
+    if not _CLASSES:
+        _build_tables()
+    (v0, s0), (v1, s1), (v2, s2), (v3, s3), (v4, s4) = cards5
+    try:
+        if s0 == s1 == s2 == s3 == s4:
+            mask = (1 << (v0 - 2)) | (1 << (v1 - 2)) | (1 << (v2 - 2)) | (1 << (v3 - 2)) | (1 << (v4 - 2))
+            strength = _FLUSH5[mask]
+            if strength >= 0:
+                return strength
+        else:
+            return _PRIME5[_PRIMES[v0 - 2] * _PRIMES[v1 - 2] * _PRIMES[v2 - 2] * _PRIMES[v3 - 2] * _PRIMES[v4 - 2]]
+    except (IndexError, KeyError, TypeError):
+        pass
+    raise ValueError(f"Not a valid 5-card hand: {cards5}")
+
+# ---------- strength values ----------
+
+def strength_of(hand: tuple) -> int:
+    #hand tuple from rank5 / rank7 -> strength
+    if not _STRENGTH:
+        _build_tables()
+    try:
+        return _STRENGTH[tuple(hand)]
+    except KeyError:
+        raise ValueError(f"Not a hand value: {hand}") from None
+
+def strength_to_tuple(strength: int) -> tuple:
+    #strength -> the tuple rank5 / rank7 return
+    if not _CLASSES:
+        _build_tables()
+    if not 0 <= strength < len(_CLASSES):
+        raise ValueError(f"Bad strength {strength}")
+    return _CLASSES[strength]
+
+# ---------- packed values ----------
+
+#tuple length of each category, high card .. straight flush
+_TUPLE_LEN = (6, 5, 4, 4, 2, 6, 3, 3, 2)
+
+def pack_hand(hand: tuple) -> int:
+    #hand tuple from rank5 / rank7 -> packed int
+    if not hand or not 0 <= hand[0] <= 8 or len(hand) != _TUPLE_LEN[hand[0]]:
+        raise ValueError(f"Not a hand value: {hand}")
+    value = hand[0]
+    for i in range(1, 6):
+        k = hand[i] if i < len(hand) else 0
+        if i < len(hand) and not 2 <= k <= 14:
+            raise ValueError(f"Not a hand value: {hand}")
+        value = value << 4 | k
+    return value
+
+def unpack_hand(value: int) -> tuple:
+    #packed int -> the tuple rank5 / rank7 return
+    category = value >> 20
+    if not 0 <= category <= 8:
+        raise ValueError(f"Not a packed hand value: {value}")
+    n = _TUPLE_LEN[category]
+    return (category, *((value >> 4 * (5 - i)) & 15 for i in range(1, n)))
@@ -1,27 +1,277 @@
-# reuses hand_rank5.py but enumerates C(7,5) = 21 possibilities of five-card subsets
-# could optimize with a direct 7-card evaluator
+# best 5-card hand out of 7 cards
+# two evaluators, both return the same tuples as hand_rank5.rank5:
+#   - "table": direct evaluator driven by precomputed lookup tables (default)
+#   - "reference": enumerates C(7,5) = 21 five-card subsets through hand_rank5.rank5_reference
+#
+# table evaluator
+#   - rank key: every card adds 1 << 3*(v-2), so the key holds the count of each rank (max 4 fits in 3 bits)
+#   - rank table: rank key -> best non-flush hand for that multiset of ranks
+#   - flush table: 13-bit mask of the flush suit's ranks -> best flush / straight flush
+#   - with 7 cards a flush rules out quads and full houses, so a flush hand is always the flush table entry
+#   - rank7_ints is the same thing on integer cards (see cards.py) and skips input validation for hot loops
+#   - packed=True returns hand_rank5's packed int instead of the tuple (parallel packed tables, same lookups)
+#
+# strength values
+#   - every 5-card hand falls in one of 7462 classes, strength is the class index (0 = 7-5-4-3-2, 7461 = royal flush)
+#   - strengths compare exactly like the tuples, see strength_of / strength_to_tuple (from hand_rank5)
+#   - rank7_batch scores an (N, 7) NumPy array of integer cards into N strengths in one call (needs numpy)
+#
+# board-shared ranking
+#   - rank_board_combos scores many hole-card combos on one 5-card board
+#   - the board's rank key, suit masks and flush suit are worked out once, each combo only adds its 2 cards
+#   - rank_completions_ints does the same for 6 known cards and every possible 7th card (river breakdowns)
 
 from itertools import combinations
-from typing import List, Tuple
-from hand_rank5 import rank5
+from typing import Dict, List, Optional, Sequence, Tuple
+from cards import Card, card_to_int, int_to_card, make_deck_ints, cards_to_mask
+from hand_rank5 import (rank5_reference, strength_of, strength_to_tuple, pack_hand,
+                        _POPCOUNT, _PACKED, _best_non_flush, _flush_hand, _rank_multisets)
+import instrument
 
-Card = Tuple[int, str]
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for rank7_batch
+    np = None
 
-def rank7(cards7: List[Card]) -> tuple:
+EVALUATORS = ("table", "reference")
+_evaluator = "table"
+
+def set_evaluator(name: str) -> None:
+    #pick the evaluator used by rank7 when none is passed
+    global _evaluator
+    if name not in EVALUATORS:
+        raise ValueError(f"Unknown evaluator '{name}', expected one of {EVALUATORS}")
+    _evaluator = name
+
+def get_evaluator() -> str:
+    return _evaluator
+
+def rank7(cards7: List[Card], *, evaluator: Optional[str] = None, packed: bool = False):
     #get best 5-card poker hand available from 7 cards
 
     if len(cards7) != 7:
         raise ValueError("Expected exactly 7 cards")
-    
+
     #check that all cards are distinct
     if len(set(cards7)) != 7:
         raise ValueError("Cards must be distinct")
-    
+    if instrument.active is not None:
+        instrument.active.count("rank7")
+
+    name = _evaluator if evaluator is None else evaluator
+    if name == "table":
+        return _rank7_table([card_to_int(c) for c in cards7], packed)
+    if name == "reference":
+        best = _rank7_reference(cards7)
+        return pack_hand(best) if packed else best
+    raise ValueError(f"Unknown evaluator '{name}', expected one of {EVALUATORS}")
+
+def rank7_ints(cards7: Sequence[int], *, evaluator: Optional[str] = None, packed: bool = False):
+    #rank7 for 7 distinct integer cards, no validation
+    # not counted by instrument (hot loops count their own evaluations)
+    name = _evaluator if evaluator is None else evaluator
+    if name == "table":
+        return _rank7_table(cards7, packed)
+    if name == "reference":
+        best = _rank7_reference([int_to_card(c) for c in cards7])
+        return pack_hand(best) if packed else best
+    raise ValueError(f"Unknown evaluator '{name}', expected one of {EVALUATORS}")
+
+def _rank7_reference(cards7: List[Card]) -> tuple:
     best = None
 
     for five in combinations(cards7, 5):
-        r = rank5(list(five))
+        r = rank5_reference(list(five))
         if best is None or r > best:
             best = r
 
-    return best
\ No newline at end of file
+    return best
+
+# ---------- lookup tables ----------
+
+_FLUSH_TABLE: List[Optional[tuple]] = [None] * 8192
+_RANK_TABLE: Dict[int, tuple] = {}
+#same tables with packed values
+_FLUSH_PACKED: List[int] = [0] * 8192
+_RANK_PACKED: Dict[int, int] = {}
+
+#per card int: rank key increment and rank bit
+_CARD_KEY: List[int] = [1 << 3 * (c >> 2) for c in range(52)]
+_CARD_BIT: List[int] = [1 << (c >> 2) for c in range(52)]
+
+def _build_tables() -> None:
+    for mask in range(8192):
+        if _POPCOUNT[mask] >= 5:
+            _FLUSH_TABLE[mask] = _flush_hand(mask)
+            _FLUSH_PACKED[mask] = pack_hand(_FLUSH_TABLE[mask])
+    for counts in _rank_multisets(7):
+        key = sum(n << 3 * (v - 2) for v, n in counts.items())
+        _RANK_TABLE[key] = _best_non_flush(counts)
+    _RANK_PACKED.update((k, pack_hand(t)) for k, t in _RANK_TABLE.items())
+
+def _ensure_tables() -> None:
+    #tables are built on first use (~50k rank multisets)
+    if not _RANK_TABLE:
+        _build_tables()
+
+def _rank7_table(cards7: Sequence[int], packed: bool = False):
+    _ensure_tables()
+    ranks, flushes = (_RANK_PACKED, _FLUSH_PACKED) if packed else (_RANK_TABLE, _FLUSH_TABLE)
+    key = 0
+    masks = [0, 0, 0, 0]
+    for c in cards7:
+        key += _CARD_KEY[c]
+        masks[c & 3] |= _CARD_BIT[c]
+    for m in masks:
+        #distinct ranks per suit, so the popcount is the suit's card count
+        if _POPCOUNT[m] >= 5:
+            return flushes[m]
+    return ranks[key]
+
+# ---------- numpy batch evaluator ----------
+
+_NP_TABLES: Dict[str, "np.ndarray"] = {}
+
+def _np_tables() -> Dict[str, "np.ndarray"]:
+    if not _NP_TABLES:
+        _ensure_tables()
+        keys = sorted(_RANK_TABLE)
+        _NP_TABLES["rank_keys"] = np.array(keys, dtype=np.int64)
+        _NP_TABLES["rank_vals"] = np.array([strength_of(_RANK_TABLE[k]) for k in keys], dtype=np.int32)
+        _NP_TABLES["flush_vals"] = np.array([strength_of(t) if t is not None else -1 for t in _FLUSH_TABLE], dtype=np.int32)
+        _NP_TABLES["popcount"] = np.array(_POPCOUNT, dtype=np.int8)
+        _NP_TABLES["packed"] = np.array(_PACKED, dtype=np.int32)
+    return _NP_TABLES
+
+def rank7_batch(cards: "np.ndarray", *, packed: bool = False) -> "np.ndarray":
+    #cards is an (N, 7) integer array of distinct card ints per row, returns N int32 strengths (packed values with packed=True)
+    if np is None:
+        raise ImportError("rank7_batch requires numpy")
+    arr = np.asarray(cards)
+    if arr.ndim != 2 or arr.shape[1] != 7:
+        raise ValueError(f"Expected an (N, 7) array, got shape {arr.shape}")
+    if not np.issubdtype(arr.dtype, np.integer):
+        raise ValueError("Expected integer card values")
+    if arr.size and (arr.min() < 0 or arr.max() > 51):
+        raise ValueError("Card ints must be in 0..51")
+    srt = np.sort(arr, axis=1)
+    if np.any(srt[:, 1:] == srt[:, :-1]):
+        raise ValueError("Cards must be distinct")
+
+    t = _np_tables()
+    if instrument.active is not None:
+        instrument.active.count("rank7", len(arr))
+    arr = arr.astype(np.int64)
+    ranks = arr >> 2
+    suits = arr & 3
+    keys = (np.int64(1) << (3 * ranks)).sum(axis=1)
+    out = t["rank_vals"][np.searchsorted(t["rank_keys"], keys)]
+
+    bits = np.int64(1) << ranks
+    for su in range(4):
+        mask = np.where(suits == su, bits, 0).sum(axis=1)
+        flush = t["popcount"][mask] >= 5
+        if flush.any():
+            out[flush] = t["flush_vals"][mask[flush]]
+    return t["packed"][out] if packed else out
+
+# ---------- board-shared ranking ----------
+
+def rank_combos_ints(board5: Sequence[int], combos: Sequence[Sequence[int]], *, packed: bool = False) -> list:
+    #hand value of every (a, b) int combo on a 5-card int board, no validation
+    _ensure_tables()
+    ranks, flushes = (_RANK_PACKED, _FLUSH_PACKED) if packed else (_RANK_TABLE, _FLUSH_TABLE)
+    if instrument.active is not None:
+        instrument.active.count("rank7", len(combos))
+    key = 0
+    masks = [0, 0, 0, 0]
+    for c in board5:
+        key += _CARD_KEY[c]
+        masks[c & 3] |= _CARD_BIT[c]
+    # only a suit with 3+ board cards can make a flush, a 5-card board has at most one
+    fs = -1
+    for su in range(4):
+        if _POPCOUNT[masks[su]] >= 3:
+            fs = su
+    fmask = masks[fs] if fs >= 0 else 0
+
+    out: List[tuple] = []
+    for a, b in combos:
+        if fs >= 0:
+            m = fmask
+            if a & 3 == fs:
+                m |= _CARD_BIT[a]
+            if b & 3 == fs:
+                m |= _CARD_BIT[b]
+            if _POPCOUNT[m] >= 5:
+                out.append(flushes[m])
+                continue
+        out.append(ranks[key + _CARD_KEY[a] + _CARD_KEY[b]])
+    return out
+
+def rank_completions_ints(cards6: Sequence[int], next_cards: Sequence[int], *, packed: bool = False) -> list:
+    #hand value of the 6 int cards plus each one of next_cards, the 6 cards are worked out once
+    _ensure_tables()
+    ranks, flushes = (_RANK_PACKED, _FLUSH_PACKED) if packed else (_RANK_TABLE, _FLUSH_TABLE)
+    if instrument.active is not None:
+        instrument.active.count("rank7", len(next_cards))
+    key = 0
+    masks = [0, 0, 0, 0]
+    for c in cards6:
+        key += _CARD_KEY[c]
+        masks[c & 3] |= _CARD_BIT[c]
+    # only a suit with 4+ of the 6 cards can make a flush, there is at most one
+    fs = -1
+    for su in range(4):
+        if _POPCOUNT[masks[su]] >= 4:
+            fs = su
+    fmask = masks[fs] if fs >= 0 else 0
+    made = flushes[fmask] if _POPCOUNT[fmask] >= 5 else None
+
+    out: List[tuple] = []
+    for c in next_cards:
+        if c & 3 == fs:
+            m = fmask | _CARD_BIT[c]
+            if _POPCOUNT[m] >= 5:
+                out.append(flushes[m])
+                continue
+        elif made is not None:
+            out.append(made)
+            continue
+        out.append(ranks[key + _CARD_KEY[c]])
+    return out
+
+def rank_board_combos(board: List[Card], combos: Optional[List[Tuple[Card, Card]]] = None) -> Dict[str, list]:
+    #score hole-card combos on a full board, default every combo not using a board card (1081 of 1326)
+    # combos can come from ranges.range_to_combos, ones touching the board are dropped
+    # returns parallel lists:
+    #   combos: the scored combos
+    #   values: rank7 tuples
+    #   strength: strength_of each value, compare these for showdowns
+    #   order: indices into combos from strongest to weakest (ties keep input order)
+    if len(board) != 5:
+        raise ValueError("Expected exactly 5 board cards")
+    board_ints = [card_to_int(c) for c in board]
+    board_mask = cards_to_mask(board_ints)
+    if board_mask.bit_count() != 5:
+        raise ValueError("Cards must be distinct")
+
+    if combos is None:
+        pairs = list(combinations(make_deck_ints(board_mask), 2))
+        kept = [(int_to_card(b), int_to_card(a)) for a, b in pairs]
+    else:
+        pairs = []
+        kept = []
+        for c1, c2 in combos:
+            a, b = card_to_int(c1), card_to_int(c2)
+            if a == b:
+                raise ValueError("Cards must be distinct")
+            if (1 << a | 1 << b) & board_mask:
+                continue
+            pairs.append((a, b))
+            kept.append((c1, c2))
+
+    values = rank_combos_ints(board_ints, pairs)
+    strength = [strength_of(v) for v in values]
+    order = sorted(range(len(values)), key=lambda i: -strength[i])
+    return {"combos": kept, "values": values, "strength": strength, "order": order}
@@ -0,0 +1,85 @@
+# opt-in instrumentation for the equity hot paths
+# off by default: instrumented code only checks `instrument.active is not None`
+#
+#   with instrument.collect() as stats:
+#       equity_hu_exact(hero, villain, board)
+#   stats.as_dict()  ->  {"counters": {"rank7": 1980, "runouts_scored": 990, ...},
+#                         "timings": {"validate": ..., "deck": ..., "enumerate": ..., "evaluate": ...}}
+#
+# counters
+#   rank5 / rank7: hand evaluations (rank7, rank7_batch, board-shared ranking and the equity_hu loops;
+#                  bare rank7_ints calls are left uncounted to keep the check out of the innermost loop)
+#   runouts_scored: runouts actually evaluated, runouts_total: runouts they stand for (symmetry weights)
+# timings (seconds)
+#   validate, deck, enumerate (whole runout loop), evaluate (scoring inside that loop)
+#
+# profile_call runs one call under cProfile and writes a .pstats file (snakeviz, flameprof, gprof2dot read it)
+
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+import cProfile
+import time
+
+class Stats:
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+        self.timings: Dict[str, float] = {}
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_time(self, name: str, seconds: float) -> None:
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def as_dict(self) -> Dict[str, Dict]:
+        return {"counters": dict(self.counters), "timings": dict(self.timings)}
+
+    def __repr__(self) -> str:
+        return f"Stats(counters={self.counters}, timings={self.timings})"
+
+# stats being collected, None when instrumentation is off
+active: Optional[Stats] = None
+
+@contextmanager
+def collect(stats: Optional[Stats] = None, *, callback: Optional[Callable[[Stats], None]] = None) -> Iterator[Stats]:
+    #turn instrumentation on for the block, callback gets the stats when it ends
+    global active
+    prev = active
+    active = stats if stats is not None else Stats()
+    current = active
+    try:
+        yield current
+    finally:
+        active = prev
+        if callback is not None:
+            callback(current)
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    #time a block into the active stats, does nothing when instrumentation is off
+    if active is None:
+        yield
+        return
+    with active.phase(name):
+        yield
+
+def profile_call(func: Callable[..., Any], *args, path: Optional[str] = None, **kwargs) -> Tuple[Any, Stats, cProfile.Profile]:
+    #run func(*args, **kwargs) with stats and cProfile on, dump the profile to path if given
+    prof = cProfile.Profile()
+    with collect() as stats:
+        prof.enable()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            prof.disable()
+    if path is not None:
+        prof.dump_stats(path)
+    return result, stats, prof
@@ -0,0 +1,85 @@
+# load generator for a running equity_service
+#
+#   python equity_service.py --port 8765 &
+#   python loadgen.py --port 8765 --concurrency 64 --requests 5000
+#
+# random heads-up spots on a small pool of boards (so micro-batching has something to share),
+# reports client-side throughput and latency percentiles plus the service's own metrics
+
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from cards import make_deck, card_str
+from equity_service import DEFAULT_HOST, DEFAULT_PORT, EquityClient
+
+def make_spots(n: int, *, boards: int = 20, seed: int = 1234) -> List[Dict]:
+    #n random spots spread over `boards` flops / turns / rivers
+    rng = random.Random(seed)
+    deck = make_deck()
+    pool = [rng.sample(deck, rng.choice((3, 4, 5))) for _ in range(boards)]
+    spots = []
+    for _ in range(n):
+        board = rng.choice(pool)
+        hole = rng.sample([c for c in deck if c not in board], 4)
+        spots.append({"hero": [card_str(c) for c in hole[:2]], "villain": [card_str(c) for c in hole[2:]],
+                      "board": [card_str(c) for c in board]})
+    return spots
+
+async def run_load(spots: List[Dict], *, concurrency: int, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                   unix_path: Optional[str] = None, connections: int = 4) -> Dict:
+    clients = [await EquityClient.connect(host, port, unix_path=unix_path) for _ in range(max(1, connections))]
+    todo = iter(enumerate(spots))
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker(client: EquityClient) -> None:
+        nonlocal errors
+        for _, spot in todo:
+            start = time.perf_counter()
+            res = await client.equity(spot["hero"], spot["villain"], spot["board"])
+            latencies.append(time.perf_counter() - start)
+            errors += "error" in res
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(clients[i % len(clients)]) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    service = await clients[0].metrics()
+    for c in clients:
+        await c.close()
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0.0
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "latency_ms_p50": pct(0.50),
+        "latency_ms_p95": pct(0.95),
+        "latency_ms_p99": pct(0.99),
+        "service": service,
+    }
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Send random equity requests to a running equity_service.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="connect to this unix socket instead of TCP")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32, help="requests in flight")
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--boards", type=int, default=20, help="distinct boards in the corpus")
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args(argv)
+
+    spots = make_spots(args.requests, boards=args.boards, seed=args.seed)
+    report = asyncio.run(run_load(spots, concurrency=args.concurrency, host=args.host, port=args.port,
+                                  unix_path=args.unix, connections=args.connections))
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# precomputed preflop heads-up equity, stored in a compact binary file and read through mmap
+#
+# file layout (little endian)
+#   header: magic b"PVPF", version u16, flags u16, runouts per matchup u32, then 4 pad bytes (16 bytes)
+#   class equity: float32[169 * 169], hero class x villain class (ranges.hand_class_index grid)
+#   class weight: u32[169 * 169], number of card-compatible combo matchups behind each class cell
+#   if flags & FLAG_EXACT:
+#     wins: u32[1326 * 1326], hero combo x villain combo (cards.combo_index), MISSING when not built
+#     ties: u32[1326 * 1326]
+#
+# build with the existing evaluator:
+#   python preflop_table.py preflop.bin --exact --workers 32
+# matchups equal under a suit relabeling share one enumeration, but a full build is still hours of CPU,
+# with or without --exact (the class grid needs every matchup's counts too)
+
+from array import array
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Tuple
+import argparse
+import math
+import mmap
+import struct
+import sys
+
+from cards import Card, NUM_COMBOS, card_to_int, combo_index, index_to_combo, int_to_card
+from ranges import NUM_HAND_CLASSES, hand_class_index
+from suit_iso import canonical_spot
+
+MAGIC = b"PVPF"
+VERSION = 1
+FLAG_EXACT = 1
+MISSING = 0xFFFFFFFF
+RUNOUTS = math.comb(48, 5)  # 1,712,304 boards per matchup
+
+_HEADER = struct.Struct("<4sHHI4x")
+_CELLS = NUM_HAND_CLASSES * NUM_HAND_CLASSES
+_PAIRS = NUM_COMBOS * NUM_COMBOS
+
+class PreflopTable:
+    #read-only view of a table file, lookups are O(1) reads from the mapping
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, flags, runouts = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {VERSION} preflop table")
+        self.exact = bool(flags & FLAG_EXACT)
+        self.runouts = runouts
+
+        expected = _HEADER.size + 8 * _CELLS + (8 * _PAIRS if self.exact else 0)
+        if len(self._mm) != expected:
+            self._mm.close()
+            raise ValueError(f"{path} has size {len(self._mm)}, expected {expected}")
+
+        view = self._view = memoryview(self._mm)
+        off = _HEADER.size
+        self._class_eq = view[off:off + 4 * _CELLS].cast("f")
+        off += 4 * _CELLS
+        self._class_weight = view[off:off + 4 * _CELLS].cast("I")
+        off += 4 * _CELLS
+        if self.exact:
+            self._wins = view[off:off + 4 * _PAIRS].cast("I")
+            off += 4 * _PAIRS
+            self._ties = view[off:off + 4 * _PAIRS].cast("I")
+
+    def close(self) -> None:
+        self._class_eq.release()
+        self._class_weight.release()
+        if self.exact:
+            self._wins.release()
+            self._ties.release()
+        self._view.release()
+        self._mm.close()
+
+    def __enter__(self) -> "PreflopTable":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def class_equity(self, hero_class: int, villain_class: int) -> Tuple[float, int]:
+        #(equity averaged over compatible combo matchups, number of those matchups)
+        cell = hero_class * NUM_HAND_CLASSES + villain_class
+        return self._class_eq[cell], self._class_weight[cell]
+
+    def lookup(self, hero_hole: List[Card], villain_hole: List[Card]) -> Optional[Dict[str, float]]:
+        #exact counts for a preflop matchup, None if the table has no entry for it
+        if not self.exact:
+            return None
+        h = combo_index(card_to_int(hero_hole[0]), card_to_int(hero_hole[1]))
+        v = combo_index(card_to_int(villain_hole[0]), card_to_int(villain_hole[1]))
+        cell = h * NUM_COMBOS + v
+        wins, ties = self._wins[cell], self._ties[cell]
+        if wins == MISSING:
+            return None
+        total = self.runouts
+        return {"equity": (wins + 0.5 * ties) / total, "wins": wins, "ties": ties, "total": total}
+
+# ---------- building ----------
+
+def write_table(path: str, class_eq: Iterable[float], class_weight: Iterable[int], wins: Optional[Iterable[int]] = None, ties: Optional[Iterable[int]] = None, *, runouts: int = RUNOUTS) -> None:
+    #class_eq / class_weight have 169*169 entries, wins / ties 1326*1326 (or None for a class-only table)
+    sections = [array("f", class_eq), array("I", class_weight)]
+    exact = wins is not None
+    if exact:
+        if ties is None:
+            raise ValueError("wins and ties go together")
+        sections += [array("I", wins), array("I", ties)]
+    sizes = [_CELLS, _CELLS] + ([_PAIRS, _PAIRS] if exact else [])
+    for sec, size in zip(sections, sizes):
+        if len(sec) != size:
+            raise ValueError(f"Section has {len(sec)} entries, expected {size}")
+    if sys.byteorder != "little":
+        for sec in sections:
+            sec.byteswap()
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, FLAG_EXACT if exact else 0, runouts))
+        for sec in sections:
+            sec.tofile(f)
+
+def _canonical_matchup(h: int, v: int) -> Tuple[int, int]:
+    #(hero combo, villain combo) of the matchup's suit-isomorphism representative
+    hero, villain = canonical_spot((index_to_combo(h), index_to_combo(v)))
+    return combo_index(*hero), combo_index(*villain)
+
+def _count_matchup(key: Tuple[int, int]) -> Tuple[Tuple[int, int], int, int]:
+    from equity_hu import enumerate_runouts
+    from hand_rank7 import np
+
+    h, v = key
+    hero = [int_to_card(c) for c in index_to_combo(h)]
+    villain = [int_to_card(c) for c in index_to_combo(v)]
+    res = enumerate_runouts(hero, villain, [], allow_large=True, vectorized=np is not None)
+    return key, res["wins"], res["ties"]
+
+def build_table(path: str, *, exact: bool = True, workers: int = 1, progress: bool = False, matchups: Optional[Iterable[Tuple[int, int]]] = None) -> None:
+    #enumerate every preflop matchup (once per suit-isomorphism class) and write the table
+    # exact=False leaves the 1326x1326 combo counts out of the file but still runs every enumeration,
+    #   since the class grid is averaged from them: same CPU time as the exact build, a ~230 KB file instead of ~14 MB
+    # matchups limits the build to those (combo index, combo index) pairs, everything else stays MISSING
+    pairs = combinations(range(NUM_COMBOS), 2) if matchups is None else sorted({tuple(sorted(m)) for m in matchups})
+    canon: Dict[Tuple[int, int], Tuple[int, int]] = {}
+    for h, v in pairs:
+        if set(index_to_combo(h)) & set(index_to_combo(v)):
+            continue
+        canon[(h, v)] = _canonical_matchup(h, v)
+    todo = sorted(set(canon.values()))
+
+    counts: Dict[Tuple[int, int], Tuple[int, int]] = {}
+    if workers > 1:
+        from multiprocessing import Pool
+        with Pool(workers) as pool:
+            results = pool.imap_unordered(_count_matchup, todo, chunksize=4)
+            for n, (key, w, t) in enumerate(results, 1):
+                counts[key] = (w, t)
+                if progress:
+                    print(f"{n}/{len(todo)}", file=sys.stderr)
+    else:
+        for n, key in enumerate(todo, 1):
+            _, w, t = _count_matchup(key)
+            counts[key] = (w, t)
+            if progress:
+                print(f"{n}/{len(todo)}", file=sys.stderr)
+
+    wins = array("I", [MISSING]) * _PAIRS
+    ties = array("I", [MISSING]) * _PAIRS
+    for (h, v), key in canon.items():
+        w, t = counts[key]
+        wins[h * NUM_COMBOS + v], ties[h * NUM_COMBOS + v] = w, t
+        wins[v * NUM_COMBOS + h], ties[v * NUM_COMBOS + h] = RUNOUTS - w - t, t
+
+    class_eq, class_weight = classes_from_combos(wins, ties)
+    if exact:
+        write_table(path, class_eq, class_weight, wins, ties)
+    else:
+        write_table(path, class_eq, class_weight)
+
+def classes_from_combos(wins: array, ties: array, runouts: int = RUNOUTS) -> Tuple[List[float], List[int]]:
+    #average exact combo matchups into the 169x169 class grid
+    cls = [hand_class_index(*[int_to_card(c) for c in index_to_combo(i)]) for i in range(NUM_COMBOS)]
+    share = [0.0] * _CELLS
+    weight = [0] * _CELLS
+    for h in range(NUM_COMBOS):
+        row = h * NUM_COMBOS
+        base = cls[h] * NUM_HAND_CLASSES
+        for v in range(NUM_COMBOS):
+            w = wins[row + v]
+            if w == MISSING:
+                continue
+            cell = base + cls[v]
+            share[cell] += (w + 0.5 * ties[row + v]) / runouts
+            weight[cell] += 1
+    class_eq = [share[i] / weight[i] if weight[i] else 0.0 for i in range(_CELLS)]
+    return class_eq, weight
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build the preflop heads-up equity table.")
+    parser.add_argument("out", help="output table file")
+    parser.add_argument("--exact", action="store_true", help="also store the 1326x1326 exact combo counts (the build takes as long either way)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes")
+    parser.add_argument("--progress", action="store_true", help="print progress to stderr")
+    args = parser.parse_args(argv)
+    build_table(args.out, exact=args.exact, workers=args.workers, progress=args.progress)
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,54 @@
-from typing import Iterable, List, Tuple, Optional
-from cards import RANKS, SUITS, RANK_TO_VAL, VAL_TO_RANK, Card
-
-def _all_pair_combos(v: int) -> List[Tuple[Card, Card]]:
-    # v is rank, should be 6 suit combos for pocket pair
-    out: List[Tuple[Card, Card]] = []
-    suits = list(SUITS)
-    for i in range(len(suits)):
-        for j in range(i + 1, len(suits)):
-            out.append(((v, suits[i]), (v, suits[j])))
-
-    return out # 6 combos
-
-def _all_nonpair_combos(vhi: int, vlo: int, suited_flag: Optional[bool]) -> List[Tuple[Card, Card]]:
-    #suited_flag is True for suited only, False for offsuit only, None for both
-    out: List[Tuple[Card, Card]] = []
-    if suited_flag is None:
-        out.extend(_all_nonpair_combos(vhi, vlo, True))
-        out.extend(_all_nonpair_combos(vhi, vlo, False))
-        return out
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple, Optional, Sequence, Union
+import re
+from cards import (RANKS, SUITS, RANK_TO_VAL, VAL_TO_RANK, Card, card_to_int, int_to_card, card_str, parse_card,
+                   NUM_COMBOS, combo_index, index_to_combo, mask_to_ints)
 
-    if suited_flag:
-        for s in SUITS:
-            out.append(((vhi, s), (vlo, s)))
-        return out
-    #offsuit
-    for s1 in SUITS:
-        for s2 in SUITS:
-            if s1 == s2:
-                continue
-            out.append(((vhi, s1), (vlo, s2)))
-    return out
+# starting hand classes on the usual 13x13 grid, A first:
+#   - pairs on the diagonal, suited above it (row = high card), offsuit below it (column = high card)
+#   - class index is row * 13 + col
+NUM_HAND_CLASSES = 169
 
 def _expand_token(token: str) -> List[Tuple[str, int, int, Optional[bool]]]:
-    # expand single token into list of (kind, vhi, vlo, suited_flag) where kind is either pair or nonpair
+    # expand single token into list of (kind, vhi, vlo, suited_flag) where kind is pair, nonpair or combo
+    # (combo carries the two card ints instead of ranks)
     t = token.strip()
     if not t or len(t) < 2:
         return []
+    if t.lower() == "random":
+        return ([("pair", v, 0, None) for v in range(2, 15)] +
+                [("nonpair", hi, lo, None) for hi in range(3, 15) for lo in range(2, hi)])
+    # spans: "22-77", "KTs-K7s" (kicker runs down), "T9s-54s" (both cards step, same gap)
+    if "-" in t:
+        ends = t.split("-")
+        if len(ends) != 2 or "+" in t:
+            return []
+        first, last = _expand_token(ends[0]), _expand_token(ends[1])
+        if len(first) != 1 or len(last) != 1:
+            return []
+        (kind, hi1, lo1, flag1), (kind2, hi2, lo2, flag2) = first[0], last[0]
+        if kind != kind2 or flag1 != flag2 or kind == "combo":
+            return []
+        if kind == "pair":
+            lo, hi = sorted((hi1, hi2))
+            return [("pair", v, 0, None) for v in range(lo, hi + 1)]
+        lo, hi = sorted((lo1, lo2))
+        if hi1 == hi2:
+            return [("nonpair", hi1, v, flag1) for v in range(lo, hi + 1)]
+        if hi1 - lo1 == hi2 - lo2:
+            gap = hi1 - lo1
+            return [("nonpair", v + gap, v, flag1) for v in range(lo, hi + 1)]
+        return []
+    # one specific combo, e.g. "AhKh"
+    if len(t) == 4 and t[1] in SUITS and t[3] in SUITS:
+        try:
+            a, b = card_to_int(parse_card(t[:2])), card_to_int(parse_card(t[2:]))
+        except ValueError:
+            return []
+        if a == b:
+            return []
+        return [("combo", a, b, None)]
     plus = t.endswith("+")
     if plus:
         t = t[:-1]
@@ -72,6 +85,19 @@ def _expand_token(token: str) -> List[Tuple[str, int, int, Optional[bool]]]:
         lows = [v2]
     return [("nonpair", v1, lo, suited_flag) for lo in lows]
 
+def _split_weight(token: str) -> Tuple[str, float]:
+    # "AK:0.5" -> ("AK", 0.5), weight defaults to 1
+    body, sep, w = token.partition(":")
+    if not sep:
+        return token, 1.0
+    try:
+        weight = float(w)
+    except ValueError:
+        raise ValueError(f"Bad weight in token '{token}'") from None
+    if not 0.0 < weight <= 1.0:
+        raise ValueError(f"Weight out of range (0, 1] in token '{token}'")
+    return body.strip(), weight
+
 def parse_range_tokens(range_list: List[str]) -> List[str]:
     # validate and normalize list of tokens
     out: List[str] = []
@@ -80,7 +106,7 @@ def parse_range_tokens(range_list: List[str]) -> List[str]:
         token = token.strip()
         if not token or token in seen:
             continue
-        if _expand_token(token):
+        if _expand_token(_split_weight(token)[0]):
             out.append(token)
             seen.add(token)
         else:
@@ -90,32 +116,256 @@ def parse_range_tokens(range_list: List[str]) -> List[str]:
 def range_to_combos(range_list: List[str], exclude: Iterable[Card] = ()) -> List[Tuple[Card, Card]]:
     # convert range tokens to list of card pairs
     # exclude is for excluding cards on the table
-    exclude_set = set(exclude)
-    out: List[Tuple[Card, Card]] = []
-    for token in parse_range_tokens(range_list):
-        specs = _expand_token(token)
-        for kind, vhi, vlo, suited_flag in specs:
-            if kind == "pair":
-                combos = _all_pair_combos(vhi)
-            elif kind == "nonpair":
-                combos = _all_nonpair_combos(vhi, vlo, suited_flag)
-            else:
-                raise ValueError(f"Unknown kind '{kind}' in token '{token}'")
-            
-            for c1, c2 in combos:
-                if c1 in exclude_set or c2 in exclude_set:
-                    continue
-                #normalize order for dedup
-                if (c2[0] > c1[0]) or (c2[0] == c1[0] and c2[1] > c1[1]):
-                    combo = (c2, c1)
-                else:
-                    combo = (c1, c2)
-                out.append(combo)
+    # goes through the compiled range cache, so weights only decide membership here
+    return compile_range(range_list).without(exclude).combos()
 
-    seen = set()
-    unique: List[Tuple[Card, Card]] = []
-    for combo in out:
-        if combo not in seen: 
-            seen.add(combo)
-            unique.append(combo)
-    return unique
\ No newline at end of file
+def hand_class_index(c1: Card, c2: Card) -> int:
+    #grid index of a 2-card hand
+    (v1, s1), (v2, s2) = c1, c2
+    if (v1, s1) == (v2, s2):
+        raise ValueError("Cards must be distinct")
+    hi, lo = max(v1, v2), min(v1, v2)
+    r_hi, r_lo = 14 - hi, 14 - lo
+    if hi == lo or s1 == s2:
+        return r_hi * 13 + r_lo
+    return r_lo * 13 + r_hi
+
+def hand_class_name(index: int) -> str:
+    #"AA", "AKs", "AKo", ... as accepted by parse_range_tokens
+    if not 0 <= index < NUM_HAND_CLASSES:
+        raise ValueError(f"Bad hand class index {index}")
+    row, col = divmod(index, 13)
+    r1, r2 = VAL_TO_RANK[14 - row], VAL_TO_RANK[14 - col]
+    if row == col:
+        return r1 + r2
+    if row < col:
+        return f"{r1}{r2}s"
+    return f"{r2}{r1}o"
+
+# ---------- compiled ranges ----------
+# a Range is a set of the 1326 two-card combos (slot = cards.combo_index), stored as a 1326-bit int
+# partial frequencies go in an optional array of 1326 float weights, None means every combo in the set has weight 1
+
+_ALL_COMBOS = (1 << NUM_COMBOS) - 1
+
+#hand class of each combo slot, and the combo slots of each class and of each card
+_COMBO_CLASS: List[int] = [hand_class_index(int_to_card(a), int_to_card(b)) for a, b in map(index_to_combo, range(NUM_COMBOS))]
+_CLASS_MASKS: List[int] = [0] * NUM_HAND_CLASSES
+_CARD_MASKS: List[int] = [0] * 52
+for _i, _cls in enumerate(_COMBO_CLASS):
+    _a, _b = index_to_combo(_i)
+    _CLASS_MASKS[_cls] |= 1 << _i
+    _CARD_MASKS[_a] |= 1 << _i
+    _CARD_MASKS[_b] |= 1 << _i
+del _i, _cls, _a, _b
+
+def _spec_mask(kind: str, vhi: int, vlo: int, suited_flag: Optional[bool]) -> int:
+    #combo slots of one (kind, vhi, vlo, suited_flag) from _expand_token
+    if kind == "combo":
+        return 1 << combo_index(vhi, vlo)
+    r_hi, r_lo = 14 - vhi, 14 - vlo
+    if kind == "pair":
+        return _CLASS_MASKS[r_hi * 13 + r_hi]
+    mask = 0
+    if suited_flag is not False:
+        mask |= _CLASS_MASKS[r_hi * 13 + r_lo]
+    if suited_flag is not True:
+        mask |= _CLASS_MASKS[r_lo * 13 + r_hi]
+    return mask
+
+class Range:
+    __slots__ = ("bits", "weights")
+
+    def __init__(self, bits: int = 0, weights: Optional[Sequence[float]] = None):
+        #with weights, the combo set is the slots with a weight above 0
+        if weights is None:
+            self.bits = bits & _ALL_COMBOS
+            self.weights = None
+            return
+        if len(weights) != NUM_COMBOS:
+            raise ValueError(f"Expected {NUM_COMBOS} weights, got {len(weights)}")
+        w = array("d", weights)
+        bits = 0
+        plain = True
+        for i, x in enumerate(w):
+            if not 0.0 <= x <= 1.0:
+                raise ValueError(f"Weight {x} out of range [0, 1]")
+            if x > 0.0:
+                bits |= 1 << i
+                plain = plain and x == 1.0
+        self.bits = bits
+        self.weights = None if plain else w
+
+    @classmethod
+    def from_tokens(cls, range_list: List[str], *, weight: float = 1.0) -> "Range":
+        #same tokens as range_to_combos, token weights are scaled by `weight`
+        # a combo named by several tokens keeps its largest weight
+        if not 0.0 <= weight <= 1.0:
+            raise ValueError(f"Weight {weight} out of range [0, 1]")
+        by_weight: Dict[float, int] = {}
+        for token in parse_range_tokens(range_list):
+            body, w = _split_weight(token)
+            mask = 0
+            for spec in _expand_token(body):
+                mask |= _spec_mask(*spec)
+            by_weight[w * weight] = by_weight.get(w * weight, 0) | mask
+        full = by_weight.pop(1.0, 0)
+        by_weight.pop(0.0, None)
+        if not by_weight:
+            return cls(full)
+        w = array("d", bytes(8 * NUM_COMBOS))
+        for x in sorted(by_weight):
+            for i in mask_to_ints(by_weight[x]):
+                w[i] = x
+        for i in mask_to_ints(full):
+            w[i] = 1.0
+        return cls(weights=w)
+
+    @classmethod
+    def from_combos(cls, combos: Iterable[Tuple[Card, Card]]) -> "Range":
+        bits = 0
+        for c1, c2 in combos:
+            bits |= 1 << combo_index(card_to_int(c1), card_to_int(c2))
+        return cls(bits)
+
+    # ---- queries ----
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def weight_total(self) -> float:
+        #combo count with partial frequencies applied
+        if self.weights is None:
+            return float(len(self))
+        w = self.weights
+        return sum(w[i] for i in mask_to_ints(self.bits))
+
+    def weight(self, c1: Card, c2: Card) -> float:
+        i = combo_index(card_to_int(c1), card_to_int(c2))
+        if not self.bits >> i & 1:
+            return 0.0
+        return 1.0 if self.weights is None else self.weights[i]
+
+    def __contains__(self, combo: Tuple[Card, Card]) -> bool:
+        c1, c2 = combo
+        return bool(self.bits >> combo_index(card_to_int(c1), card_to_int(c2)) & 1)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Range):
+            return NotImplemented
+        if self.bits != other.bits:
+            return False
+        if self.weights is None and other.weights is None:
+            return True
+        return all(self._w(i) == other._w(i) for i in mask_to_ints(self.bits))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Range({len(self)} combos{'' if self.weights is None else ', weighted'})"
+
+    def _w(self, i: int) -> float:
+        return 1.0 if self.weights is None else self.weights[i]
+
+    # ---- set operations ----
+
+    def __or__(self, other: "Range") -> "Range":
+        #union, a combo in both keeps the larger weight
+        bits = self.bits | other.bits
+        if self.weights is None and other.weights is None:
+            return Range(bits)
+        return self._combine(bits, other, max)
+
+    def __and__(self, other: "Range") -> "Range":
+        #intersection, a combo keeps the smaller weight
+        bits = self.bits & other.bits
+        if self.weights is None and other.weights is None:
+            return Range(bits)
+        return self._combine(bits, other, min)
+
+    def __sub__(self, other: "Range") -> "Range":
+        #combos of self not in other, weights unchanged
+        return self._restrict(self.bits & ~other.bits)
+
+    def _combine(self, bits: int, other: "Range", pick) -> "Range":
+        w = array("d", bytes(8 * NUM_COMBOS))
+        for i in mask_to_ints(bits):
+            w[i] = pick(self._w(i) if self.bits >> i & 1 else 0.0, other._w(i) if other.bits >> i & 1 else 0.0)
+        return Range(weights=w)
+
+    def _restrict(self, bits: int) -> "Range":
+        r = Range(bits)
+        r.weights = self.weights
+        return r
+
+    # ---- card removal ----
+
+    def without_mask(self, card_mask: int) -> "Range":
+        #drop every combo holding a card of the 52-bit card mask
+        dead = 0
+        for c in mask_to_ints(card_mask):
+            dead |= _CARD_MASKS[c]
+        return self._restrict(self.bits & ~dead)
+
+    def without(self, cards: Iterable[Card]) -> "Range":
+        mask = 0
+        for card in cards:
+            mask |= 1 << card_to_int(card)
+        return self.without_mask(mask)
+
+    # ---- conversion ----
+
+    def combo_ints(self) -> List[Tuple[int, int]]:
+        #(low, high) card ints in combo slot order
+        return [index_to_combo(i) for i in mask_to_ints(self.bits)]
+
+    def combos(self) -> List[Tuple[Card, Card]]:
+        #card pairs, higher card first like range_to_combos
+        return [(int_to_card(b), int_to_card(a)) for a, b in self.combo_ints()]
+
+    def to_tokens(self) -> List[str]:
+        #whole hand classes as "AKs" etc, leftovers of partly removed classes as single combos ("AhKh")
+        # combos with a weight below 1 get a ":w" suffix, compile_range(r.to_tokens()) == r
+        out: List[str] = []
+        bits = self.bits
+        for cls, cmask in enumerate(_CLASS_MASKS):
+            have = bits & cmask
+            if not have:
+                continue
+            slots = mask_to_ints(have)
+            weights = {self._w(i) for i in slots}
+            if have == cmask and len(weights) == 1:
+                out.append(hand_class_name(cls) + _weight_suffix(weights.pop()))
+                continue
+            for i in slots:
+                a, b = index_to_combo(i)
+                out.append(card_str(int_to_card(b)) + card_str(int_to_card(a)) + _weight_suffix(self._w(i)))
+        return out
+
+def _weight_suffix(w: float) -> str:
+    return "" if w == 1.0 else f":{w:g}"
+
+# ---------- compiled range cache ----------
+# compile_range takes a range as text ("22+, AK:0.5, KTs-K7s") or a token list and caches the compiled Range
+# keyed by the normalized tokens, so repeated opener / caller ranges skip parsing
+# cached ranges are shared, treat them as read-only (every Range operation returns a new Range)
+
+RANGE_CACHE_SIZE = 512
+
+def normalize_range(spec: Union[str, Iterable[str]]) -> Tuple[str, ...]:
+    #sorted unique tokens, token order never changes a range (overlaps keep the largest weight)
+    tokens = re.split(r"[\s,]+", spec) if isinstance(spec, str) else [t.strip() for t in spec]
+    return tuple(sorted({t for t in tokens if t}))
+
+def compile_range(spec: Union[str, Iterable[str]]) -> Range:
+    return _compile_tokens(normalize_range(spec))
+
+@lru_cache(maxsize=RANGE_CACHE_SIZE)
+def _compile_tokens(tokens: Tuple[str, ...]) -> Range:
+    return Range.from_tokens(list(tokens))
+
+def range_cache_info():
+    return _compile_tokens.cache_info()
+
+def clear_range_cache() -> None:
+    _compile_tokens.cache_clear()
@@ -0,0 +1,94 @@
+# suit isomorphism for spots (hole cards + board)
+# relabeling suits doesn't change any hand value, so many spots and runouts are equivalent
+#
+# canonical_spot: same key for every suit relabeling / card order of a spot (usable as a cache key)
+# canonical_runouts: the runouts of a spot up to the suit relabelings that leave the spot's cards in place
+#   - two suits are interchangeable when every group of fixed cards (hero, villain, board, ...) holds the same ranks in both
+#   - a runout is canonical when, inside each class of interchangeable suits, its per-suit rank masks are non-increasing
+#   - its weight is the number of runouts it stands for (distinct arrangements of those masks), weights sum to C(n, k)
+#   - cards are picked from high rank to low (lower suit first within a rank), so a partial mask that breaks
+#     the order can never recover and is pruned
+
+from itertools import combinations, permutations
+from math import factorial
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+SUIT_PERMS = list(permutations(range(4)))
+
+def relabel(card: int, perm: Sequence[int]) -> int:
+    #card int with its suit mapped through perm
+    return card & ~3 | perm[card & 3]
+
+def canonical_spot(groups: Sequence[Sequence[int]]) -> Tuple[Tuple[int, ...], ...]:
+    #groups of int cards, e.g. (hero, villain, board), order inside a group doesn't matter
+    # smallest sorted form over the 24 suit relabelings
+    best = None
+    for perm in SUIT_PERMS:
+        key = tuple(tuple(sorted(relabel(c, perm) for c in g)) for g in groups)
+        if best is None or key < best:
+            best = key
+    return best
+
+def suit_classes(groups: Sequence[Sequence[int]]) -> List[List[int]]:
+    #suits that can be swapped without moving any fixed card, as lists of suit indices
+    sig: Dict[tuple, List[int]] = {}
+    for su in range(4):
+        key = tuple(frozenset(c >> 2 for c in g if c & 3 == su) for g in groups)
+        sig.setdefault(key, []).append(su)
+    return list(sig.values())
+
+def symmetry_factor(groups: Sequence[Sequence[int]]) -> int:
+    #size of the relabeling group that fixes the spot (upper bound on the runout saving)
+    out = 1
+    for cls in suit_classes(groups):
+        out *= factorial(len(cls))
+    return out
+
+def canonical_runouts(groups: Sequence[Sequence[int]], deck: Sequence[int], need: int) -> Iterator[Tuple[Tuple[int, ...], int]]:
+    #(runout, weight) for canonical runouts of `need` cards from deck
+    # deck must be the cards not in groups (so it is closed under the spot's relabelings)
+    classes = [cls for cls in suit_classes(groups) if len(cls) > 1]
+    if not classes:
+        for drawn in combinations(deck, need):
+            yield drawn, 1
+        return
+
+    #prev[su] is the suit that must keep a mask >= su's mask, -1 if none
+    prev = [-1] * 4
+    for cls in classes:
+        for a, b in zip(cls, cls[1:]):
+            prev[b] = a
+
+    cards = sorted(deck, key=lambda c: (-(c >> 2), c & 3))
+    n = len(cards)
+    masks = [0, 0, 0, 0]
+    picked: List[int] = []
+
+    def weight() -> int:
+        w = 1
+        for cls in classes:
+            counts: Dict[int, int] = {}
+            for su in cls:
+                counts[masks[su]] = counts.get(masks[su], 0) + 1
+            w *= factorial(len(cls))
+            for k in counts.values():
+                w //= factorial(k)
+        return w
+
+    def walk(start: int, left: int) -> Iterator[Tuple[Tuple[int, ...], int]]:
+        if left == 0:
+            yield tuple(picked), weight()
+            return
+        for i in range(start, n - left + 1):
+            c = cards[i]
+            su = c & 3
+            bit = 1 << (c >> 2)
+            masks[su] |= bit
+            p = prev[su]
+            if p < 0 or masks[p] >= masks[su]:
+                picked.append(c)
+                yield from walk(i + 1, left - 1)
+                picked.pop()
+            masks[su] ^= bit
+
+    yield from walk(0, need)
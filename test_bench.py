@@ -0,0 +1,33 @@
+import json
+from bench import compare, run_all, main
+
+def _res(**ops):
+    return {"results": {k: {"ops_per_sec": v, "unit": "hands"} for k, v in ops.items()}}
+
+def test_compare_flags_only_regressions_past_threshold():
+    base = _res(rank5=1000.0, rank7=1000.0, deal=1000.0)
+    cur = _res(rank5=800.0, rank7=700.0, deal=2000.0)
+    out = compare(cur, base, 0.25)
+    assert len(out) == 1 and out[0].startswith("rank7")
+    # cases missing from either side are ignored
+    assert compare(_res(rank5=1.0), _res(rank7=1000.0), 0.1) == []
+
+def test_small_run_and_baseline_roundtrip(tmp_path):
+    res = run_all(["rank5", "runouts_0"], repeat=1, scale=0.01)
+    assert set(res["results"]) == {"rank5", "runouts_0"}
+    assert all(r["ops_per_sec"] > 0 for r in res["results"].values())
+
+    baseline = tmp_path / "base.json"
+    out = tmp_path / "out.json"
+    assert main(["--only", "rank7", "--repeat", "1", "--scale", "0.01", "--baseline", str(baseline), "--save-baseline"]) == 0
+    data = json.loads(baseline.read_text())
+    # an impossible baseline must fail the check
+    data["results"]["rank7"]["ops_per_sec"] = 1e18
+    baseline.write_text(json.dumps(data))
+    assert main(["--only", "rank7", "--repeat", "1", "--scale", "0.01", "--baseline", str(baseline), "--check", "--out", str(out)]) == 1
+    assert "rank7" in json.loads(out.read_text())["results"]
+
+def test_check_without_baseline_fails_cleanly(tmp_path, capsys):
+    missing = tmp_path / "missing.json"
+    assert main(["--only", "rank7", "--repeat", "1", "--scale", "0.01", "--baseline", str(missing), "--check"]) == 2
+    assert "no baseline at" in capsys.readouterr().err
@@ -68,4 +68,52 @@ def test_shuffle_deck_reproducible():
 def test_deal_raises_on_overdraw():
     d = make_deck()
     with pytest.raises(ValueError):
-        deal(d, 53)
\ No newline at end of file
+        deal(d, 53)
+
+def test_int_cards_roundtrip_and_deck_order():
+    from cards import card_to_int, int_to_card, parse_card_int, int_card_str
+    d = make_deck()
+    for i, c in enumerate(d):
+        assert card_to_int(c) == i
+        assert int_to_card(i) == c
+        assert parse_card_int(card_str(c)) == i
+        assert int_card_str(i) == card_str(c)
+    with pytest.raises(ValueError):
+        card_to_int((1, "s"))
+    with pytest.raises(ValueError):
+        int_to_card(52)
+
+def test_masks_and_int_deck():
+    from cards import cards_to_mask, mask_to_ints, mask_size, make_deck_ints, parse_card_int, FULL_DECK_MASK
+    excl = [parse_card_int(s) for s in ("Ah", "Td", "7s")]
+    mask = cards_to_mask(excl)
+    assert mask_size(mask) == 3
+    assert mask_to_ints(mask) == sorted(excl)
+    deck = make_deck_ints(mask)
+    assert len(deck) == 49
+    assert not set(deck) & set(excl)
+    assert make_deck_ints() == list(range(52))
+    assert cards_to_mask(make_deck_ints()) == FULL_DECK_MASK
+
+def test_combo_index_roundtrip():
+    from cards import combo_index, index_to_combo, NUM_COMBOS
+    seen = set()
+    for b in range(52):
+        for a in range(b):
+            i = combo_index(a, b)
+            assert combo_index(b, a) == i
+            assert index_to_combo(i) == (a, b)
+            seen.add(i)
+    assert seen == set(range(NUM_COMBOS))
+    with pytest.raises(ValueError):
+        combo_index(3, 3)
+
+def test_parse_cards_list_or_string():
+    from cards import parse_cards
+    assert parse_cards("AhKd") == parse_cards(["Ah", "Kd"]) == [(14, "h"), (13, "d")]
+    assert parse_cards("Jh 7c, 2h") == [(11, "h"), (7, "c"), (2, "h")]
+    assert parse_cards([]) == parse_cards("") == []
+    with pytest.raises(ValueError):
+        parse_cards("AhK")
+    with pytest.raises(ValueError):
+        parse_cards(42)
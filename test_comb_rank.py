@@ -0,0 +1,30 @@
+from itertools import combinations
+from math import comb
+import pytest
+from comb_rank import rank_combination, unrank_combination, iter_combinations_slice, shard_bounds
+
+def test_rank_unrank_match_itertools_order():
+    for r, idx in enumerate(combinations(range(9), 4)):
+        assert rank_combination(idx, 9) == r
+        assert unrank_combination(9, 4, r) == idx
+    with pytest.raises(ValueError):
+        unrank_combination(9, 4, comb(9, 4))
+    with pytest.raises(ValueError):
+        rank_combination((3, 2), 9)
+
+def test_slices_concatenate_to_full_enumeration():
+    pool = list("abcdefghijk")
+    for k in (1, 2, 3, 5):
+        full = list(combinations(pool, k))
+        for shards in (1, 3, 7, 50):
+            got = []
+            for start, stop in shard_bounds(len(full), shards):
+                got.extend(iter_combinations_slice(pool, k, start, stop))
+            assert got == full
+
+def test_shard_bounds_sizes():
+    b = shard_bounds(10, 4)
+    assert b == [(0, 3), (3, 6), (6, 8), (8, 10)]
+    assert shard_bounds(2, 4)[-1] == (2, 2)
+    with pytest.raises(ValueError):
+        shard_bounds(10, 0)
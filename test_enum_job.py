@@ -0,0 +1,58 @@
+import json
+import pytest
+from cards import parse_card
+from equity_hu import equity_hu_exact
+from enum_job import EnumJob, merge_checkpoints, main
+
+def H(*ss):
+    return [parse_card(s) for s in ss]
+
+HERO, VILLAIN, BOARD = H("Ah", "Kh"), H("Qs", "Qd"), H("Jh", "7c")
+
+def test_job_matches_serial_run():
+    job = EnumJob(HERO, VILLAIN, BOARD, shards=7)
+    assert job.run() == 7
+    assert job.result() == equity_hu_exact(HERO, VILLAIN, BOARD, allow_large=True)
+
+def test_resume_from_checkpoint(tmp_path):
+    path = str(tmp_path / "job.json")
+    job = EnumJob(HERO, VILLAIN, BOARD, shards=8, path=path)
+    job.run(only=[0, 3, 5])
+    with pytest.raises(ValueError):
+        job.result()
+
+    resumed = EnumJob.from_checkpoint(path)
+    assert resumed.pending() == [1, 2, 4, 6, 7]
+    assert resumed.run() == 5
+    assert resumed.result() == equity_hu_exact(HERO, VILLAIN, BOARD, allow_large=True)
+
+def test_merge_shards_from_separate_runs(tmp_path):
+    a, b, out = (str(tmp_path / n) for n in ("a.json", "b.json", "out.json"))
+    EnumJob(HERO, VILLAIN, BOARD, shards=6, path=a).run(only=range(0, 6, 2))
+    EnumJob(HERO, VILLAIN, BOARD, shards=6, path=b).run(only=[1, 2, 3, 5])
+    job = merge_checkpoints([a, b], out)
+    assert job.complete()
+    assert job.result() == equity_hu_exact(HERO, VILLAIN, BOARD, allow_large=True)
+    assert EnumJob.from_checkpoint(out).complete()
+
+def test_merge_rejects_other_job_and_bad_counts(tmp_path):
+    a, b = str(tmp_path / "a.json"), str(tmp_path / "b.json")
+    EnumJob(HERO, VILLAIN, BOARD, shards=4, path=a).run(only=[0])
+    EnumJob(HERO, VILLAIN, BOARD, shards=5, path=b).run(only=[0])
+    with pytest.raises(ValueError):
+        merge_checkpoints([a, b])
+
+    with open(b, "w") as f:
+        data = json.load(open(a))
+        data["done"]["0"][0] += 1
+        json.dump(data, f)
+    with pytest.raises(ValueError):
+        merge_checkpoints([a, b])
+
+def test_cli_run_and_resume(tmp_path, capsys):
+    path = str(tmp_path / "job.json")
+    main(["run", path, "--hero", "AhKh", "--villain", "QsQd", "--board", "Jh7c3s", "--shards", "4", "--only", "0-1"])
+    assert capsys.readouterr().out.strip() == "2/4 shards done"
+    main(["run", path])
+    res = json.loads(capsys.readouterr().out)
+    assert res == equity_hu_exact(HERO, VILLAIN, H("Jh", "7c", "3s"))
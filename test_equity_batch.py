@@ -0,0 +1,49 @@
+import io
+import json
+from cards import parse_card
+from equity_hu import equity_hu_exact
+from equity_batch import equity_batch, run_jsonl
+
+def H(*ss):
+    return [parse_card(s) for s in ss]
+
+SPOTS = [
+    {"id": "a", "hero": ["Ah","Qh"], "villain": ["Jd","Js"], "board": ["Jh","7c","2h","9s"]},
+    {"id": "b", "hero": "KdKc", "villain": "Ah9h", "board": "Jh7c2h"},
+    {"id": "c", "hero": ["Ah","Qh"], "villain": ["Td","9d"], "board": ["Jh","7c","2h","9s"]},
+    {"id": "d", "hero": ["Jd","Js"], "villain": ["Ah","Qh"], "board": ["9s","2h","7c","Jh"]},
+    {"id": "e", "hero": ["As","Ad"], "villain": ["Ks","Kd"], "board": ["2c","3c","4c","5d","9h"]},
+    {"id": "f", "hero": ["Qs","Qd"], "villain": ["8h","8c"], "board": ["Jh","7c","2h"]},
+]
+
+def _exact(spot):
+    cards = lambda v: [parse_card(v[i:i + 2]) for i in range(0, len(v), 2)] if isinstance(v, str) else H(*v)
+    return equity_hu_exact(cards(spot["hero"]), cards(spot["villain"]), cards(spot["board"]))
+
+def test_batch_matches_exact_in_input_order():
+    for window in (1, 2, 100):
+        res = list(equity_batch(SPOTS, window=window))
+        assert [r["id"] for r in res] == [s["id"] for s in SPOTS]
+        for spot, r in zip(SPOTS, res):
+            assert {k: r[k] for k in ("equity", "wins", "ties", "total")} == _exact(spot)
+
+def test_bad_spots_reported_in_place():
+    spots = [SPOTS[0],
+             {"id": 1, "hero": ["Ah","Qh"], "villain": ["Ah","Js"], "board": ["2c","3d","4s"]},
+             {"id": 2, "hero": ["Ah","Qh"], "board": ["2c","3d","4s"]},
+             {"id": 3, "hero": ["Ah","Qh"], "villain": ["Jd","Js"], "board": []},
+             SPOTS[1]]
+    res = list(equity_batch(spots))
+    assert [r["id"] for r in res] == ["a", 1, 2, 3, "b"]
+    assert "error" in res[1] and "error" in res[2] and "error" in res[3]
+    assert "equity" in res[0] and "equity" in res[4]
+
+def test_jsonl_round_trip():
+    lines = [json.dumps(s) for s in SPOTS[:3]]
+    src = io.StringIO("\n".join(lines[:2] + ["{not json", ""] + lines[2:]) + "\n")
+    dst = io.StringIO()
+    assert run_jsonl(src, dst, window=2) == 4
+    out = [json.loads(l) for l in dst.getvalue().splitlines()]
+    assert [r.get("id") for r in out] == ["a", "b", None, "c"]
+    assert "bad JSON" in out[2]["error"]
+    assert out[3]["total"] == _exact(SPOTS[2])["total"]
@@ -0,0 +1,100 @@
+import pytest
+from cards import parse_card
+import equity_hu
+from equity_hu import equity_hu_exact
+from equity_range import equity_range_vs_range
+from equity_cache import EquityCache
+
+def H(*ss):
+    return [parse_card(s) for s in ss]
+
+def test_hu_hits_on_card_order_suit_relabel_and_swap():
+    cache = EquityCache()
+    hero, villain, board = H("Ah", "Kh"), H("Qs", "Qd"), H("Jh", "7c", "2h", "3s")
+    base = equity_hu_exact(hero, villain, board)
+    assert cache.equity_hu_exact(hero, villain, board) == base
+    assert cache.stats()["misses"] == 1
+
+    # card order and a suit relabeling (h <-> c)
+    assert cache.equity_hu_exact(H("Kc", "Ac"), villain, H("3s", "2c", "7h", "Jc")) == base
+    # seats swapped: villain's view of the same matchup
+    swapped = cache.equity_hu_exact(villain, hero, board)
+    assert swapped == equity_hu_exact(villain, hero, board)
+    assert swapped["equity"] == pytest.approx(1 - base["equity"])
+
+    st = cache.stats()
+    assert (st["hits"], st["misses"], st["entries"]) == (2, 1, 1)
+    assert st["memory_bytes"] > 0
+
+def test_set_result_cache_hooks_equity_hu_exact():
+    cache = EquityCache()
+    hero, villain, board = H("Ah", "Kh"), H("Qs", "Qd"), H("Jh", "7c", "2h", "3s")
+    equity_hu.set_result_cache(cache)
+    try:
+        first = equity_hu_exact(hero, villain, board)
+        assert equity_hu_exact(villain, hero, board)["wins"] == first["total"] - first["wins"] - first["ties"]
+        assert cache.equity_hu_exact(hero, villain, board) == first
+    finally:
+        equity_hu.set_result_cache(None)
+    st = cache.stats()
+    assert (st["hits"], st["misses"]) == (2, 1)
+
+def test_lru_eviction():
+    cache = EquityCache(max_entries=2)
+    board = H("Jh", "7c", "2h", "3s")
+    spots = [(H("Ah", "Kh"), H("Qs", "Qd")), (H("As", "Ad"), H("Kc", "Kd")), (H("9h", "8h"), H("Tc", "Td"))]
+    for hero, villain in spots:
+        cache.equity_hu_exact(hero, villain, board)
+    assert cache.stats()["entries"] == 2
+    cache.equity_hu_exact(*spots[0], board)  # evicted, recomputed
+    cache.equity_hu_exact(*spots[2], board)
+    st = cache.stats()
+    assert (st["hits"], st["misses"]) == (1, 4)
+
+def test_range_keys_normalize_and_swap():
+    cache = EquityCache()
+    board = H("Jh", "7c", "2h", "3s")
+    base = equity_range_vs_range(["QQ+", "AKs"], ["TT"], board)
+    res = cache.equity_range_vs_range(["QQ+", "AKs"], ["TT"], board)
+    assert res == {k: base[k] for k in ("equity", "wins", "ties", "total")}
+    assert cache.equity_range_vs_range("AKs, QQ+", "TT", list(reversed(board))) == res
+    swapped = cache.equity_range_vs_range(["TT"], ["AKs", "QQ+"], board)
+    assert swapped["equity"] == pytest.approx(1 - res["equity"])
+    assert cache.stats()["hits"] == 2
+
+def test_disk_tier_persists(tmp_path):
+    path = str(tmp_path / "equity.sqlite")
+    hero, villain, board = H("Ah", "Kh"), H("Qs", "Qd"), H("Jh", "7c", "2h", "3s")
+    with EquityCache(path=path) as cache:
+        first = cache.equity_hu_exact(hero, villain, board)
+    with EquityCache(path=path) as cache:
+        assert cache.equity_hu_exact(hero, villain, board) == first
+        assert cache.equity_hu_exact(hero, villain, board) == first
+        st = cache.stats()
+        assert (st["disk_hits"], st["memory_hits"], st["misses"], st["disk_entries"]) == (1, 1, 0, 1)
+
+def test_categories_bypass_the_cache():
+    cache = EquityCache()
+    hero, villain, board = H("Ah", "Kh"), H("Qs", "Qd"), H("Jh", "7c", "2h", "3s")
+    first = cache.equity_hu_exact(hero, villain, board, categories=True)
+    second = cache.equity_hu_exact(hero, villain, board, categories=True)
+    assert first == second and "category_matrix" in second
+    st = cache.stats()
+    assert (st["hits"], st["misses"], st["entries"]) == (0, 0, 0)
+
+def test_enumeration_limits_do_not_depend_on_cache_state():
+    cache = EquityCache()
+    hero, villain = H("Ah", "Kh"), H("Qs", "Qd")
+    flop = H("Jh", "7c", "2h")
+    cache.put(cache.hu_key(hero, villain, flop[:2])[0], {"equity": 0.5, "wins": 1, "ties": 0, "total": 2})
+    cache.put(cache.range_key(["AA"], ["KK"], flop[:2])[0], {"equity": 0.5, "wins": 1, "ties": 0, "total": 2})
+    with pytest.raises(ValueError):
+        cache.equity_hu_exact(hero, villain, flop[:2])
+    with pytest.raises(ValueError):
+        cache.equity_range_vs_range(["AA"], ["KK"], flop[:2])
+    equity_hu.set_result_cache(cache)
+    try:
+        with pytest.raises(ValueError):
+            equity_hu_exact(hero, villain, flop[:2])
+    finally:
+        equity_hu.set_result_cache(None)
@@ -74,4 +74,179 @@ def test_refuse_large_enumeration_by_default():
     vill = H("Qh","Qs")
     board = []
     with pytest.raises(ValueError):
-        enumerate_runouts(hero, vill, board)  # need=5 → too big by default
\ No newline at end of file
+        enumerate_runouts(hero, vill, board)  # need=5 → too big by default
+
+# ---------- NumPy batch scoring ----------
+
+def test_vectorized_matches_serial():
+    pytest.importorskip("numpy")
+    hero = H("Ah","Qh")
+    vill = H("Jd","9d")
+    for board in (H("Jh","7c","2h"), H("Jh","7c","2h","9s"), H("Kh","Th","8c","2s","3h")):
+        assert enumerate_runouts(hero, vill, board, vectorized=True) == enumerate_runouts(hero, vill, board)
+
+# ---------- Monte Carlo ----------
+
+def test_mc_reproducible_and_close_to_exact():
+    import random
+    from equity_hu import equity_hu_mc
+    hero = H("Ah","Qh")
+    vill = H("Jd","9d")
+    board = H("Jh","7c","2h")
+    r1 = equity_hu_mc(hero, vill, board, rng=random.Random(5), max_samples=4000)
+    r2 = equity_hu_mc(hero, vill, board, rng=random.Random(5), max_samples=4000)
+    assert r1 == r2
+    assert r1["total"] == 4000
+    exact = equity_hu_exact(hero, vill, board)["equity"]
+    assert abs(r1["equity"] - exact) < 5 * r1["stderr"]
+    assert r1["ci_low"] < r1["equity"] < r1["ci_high"]
+
+def test_mc_stops_on_target_stderr_preflop():
+    import random
+    from equity_hu import equity_hu_mc
+    res = equity_hu_mc(H("As","Kd"), H("Qh","Qs"), [], rng=random.Random(3), target_stderr=0.01, max_samples=None)
+    assert res["stderr"] <= 0.01
+    assert res["total"] < 10000
+
+def test_mc_full_board_and_bad_args():
+    from equity_hu import equity_hu_mc
+    res = equity_hu_mc(H("As","Kd"), H("9h","9d"), H("Ah","8s","2c","7d","3h"))
+    assert res["total"] == 1 and res["equity"] == 1.0 and res["stderr"] == 0.0
+    with pytest.raises(ValueError):
+        equity_hu_mc(H("As","Kd"), H("9h","9d"), [], max_samples=None)
+
+# ---------- process pool ----------
+
+def test_workers_match_serial():
+    from equity_hu import make_pool
+    hero = H("Ah","Qh")
+    vill = H("Jd","9d")
+    board = H("Jh","7c","2h")
+    serial = enumerate_runouts(hero, vill, board)
+    assert enumerate_runouts(hero, vill, board, workers=2) == serial
+    with make_pool(2) as pool:
+        assert enumerate_runouts(hero, vill, board, pool=pool) == serial
+        assert equity_hu_exact(hero, vill, H("Jh","7c","2h","9s"), pool=pool) == equity_hu_exact(hero, vill, H("Jh","7c","2h","9s"))
+
+# ---------- streaming ----------
+
+def test_iter_runouts_final_tally_matches_enumeration():
+    import random
+    from equity_hu import iter_runouts
+    hero = H("Ah","Qh")
+    vill = H("Jd","9d")
+    board = H("Jh","7c","2h")
+    exact = enumerate_runouts(hero, vill, board)
+    for kwargs in ({}, {"symmetry": False}, {"rng": random.Random(2)}):
+        tallies = list(iter_runouts(hero, vill, board, chunk_size=100, **kwargs))
+        last = tallies[-1]
+        assert last["done"] and not any(t["done"] for t in tallies[:-1])
+        assert (last["wins"], last["ties"], last["total"]) == (exact["wins"], exact["ties"], exact["total"])
+        assert last["runouts"] == 990
+        totals = [t["total"] for t in tallies]
+        assert totals == sorted(totals)
+
+def test_iter_runouts_random_prefix_is_usable():
+    import random
+    from equity_hu import iter_runouts
+    hero = H("As","Kd")
+    vill = H("Qh","Qs")
+    stream = iter_runouts(hero, vill, [], allow_large=True, rng=random.Random(8), chunk_size=2000)
+    first = next(stream)
+    stream.close()
+    assert first["total"] == 2000 and not first["done"]
+    eq = (first["wins"] + 0.5 * first["ties"]) / first["total"]
+    assert 0.38 < eq < 0.52  # exact is ~0.457
+
+def test_iter_runouts_random_order_covers_the_space_once():
+    import random
+    from equity_hu import iter_runouts, _shuffled_ranks
+    assert sorted(_shuffled_ranks(5000, random.Random(2))) == list(range(5000))
+    hero, vill, board = H("Ah","Kh"), H("Qs","Qd"), H("Jh","7c","2h")
+    last = list(iter_runouts(hero, vill, board, rng=random.Random(4), chunk_size=100))[-1]
+    assert last["done"]
+    assert {k: last[k] for k in ("wins", "ties", "total")} == enumerate_runouts(hero, vill, board)
+
+def test_iter_outcomes_weights_and_results():
+    from equity_hu import iter_outcomes
+    hero = H("Ah","Qh")
+    vill = H("Jd","9d")
+    board = H("Jh","7c","2h","9s")
+    outs = list(iter_outcomes(hero, vill, board))
+    assert sum(w for _, _, w in outs) == 44
+    hero_wins = sorted(d[0] for d, r, _ in outs if r == 1)
+    assert len(hero_wins) == 8 and all(c[1] == "h" for c in hero_wins)
+
+def test_outs_breakdown_turn_per_river():
+    from equity_hu import outs_breakdown
+    hero, villain, board = H("Ah","Qh"), H("Jd","Js"), H("Jh","7c","2h","9s")
+    res = outs_breakdown(hero, villain, board)
+    exact = equity_hu_exact(hero, villain, board)
+    assert {k: res[k] for k in exact} == exact
+    assert len(res["cards"]) == 44 and "pairs" not in res
+    for river, r in res["cards"].items():
+        assert r["total"] == 1
+        assert (r["wins"], r["ties"]) == {1: (1, 0), 0: (0, 1), -1: (0, 0)}[_winner(hero, villain, board + [river])]
+    outs = {c for c, r in res["cards"].items() if r["wins"]}
+    assert H("Kh")[0] in outs and H("Th")[0] in outs and H("Jc")[0] not in outs
+
+def test_outs_breakdown_flop_per_turn_and_pair():
+    from equity_hu import outs_breakdown
+    hero, villain, board = H("Ah","Qh"), H("Jd","9d"), H("Jh","7c","2h")
+    res = outs_breakdown(hero, villain, board)
+    exact = equity_hu_exact(hero, villain, board)
+    assert {k: res[k] for k in exact} == exact
+    assert len(res["cards"]) == 45 and len(res["pairs"]) == 45 * 44
+    for turn in H("Kh","9s","2c"):
+        per_turn = equity_hu_exact(hero, villain, board + [turn])
+        assert {k: res["cards"][turn][k] for k in per_turn} == per_turn
+    t, r = H("Kh","3s")
+    assert res["pairs"][(t, r)] == res["pairs"][(r, t)] == _winner(hero, villain, board + [t, r])
+    with pytest.raises(ValueError):
+        outs_breakdown(hero, villain, board + H("3s","4s"))
+
+def _winner(hero, villain, board):
+    from hand_rank7 import rank7
+    h, v = rank7(hero + board), rank7(villain + board)
+    return 1 if h > v else 0 if h == v else -1
+
+def test_mc_vectorized_reproducible_and_close():
+    import random
+    from equity_hu import equity_hu_mc
+    pytest.importorskip("numpy")
+    hero, villain, board = H("Ah","Qh"), H("Jd","9d"), H("Jh","7c","2h")
+    exact = equity_hu_exact(hero, villain, board)["equity"]
+    a = equity_hu_mc(hero, villain, board, rng=random.Random(3), max_samples=20_000, vectorized=True)
+    b = equity_hu_mc(hero, villain, board, rng=random.Random(3), max_samples=20_000, vectorized=True)
+    assert a == b and a["total"] == 20_000
+    assert abs(a["equity"] - exact) < 5 * a["stderr"]
+
+def test_category_counts_match_a_second_pass():
+    from itertools import combinations
+    from hand_rank7 import rank7
+    from cards import make_deck
+    hero, villain, board = H("Ah", "Kh"), H("Qs", "Qd"), H("Jh", "7c", "2h")
+    hist_h, hist_v = [0] * 9, [0] * 9
+    cells = [[[0, 0, 0] for _ in range(9)] for _ in range(9)]
+    for drawn in combinations(make_deck(hero + villain + board), 2):
+        h = rank7(hero + board + list(drawn))
+        v = rank7(villain + board + list(drawn))
+        hist_h[h[0]] += 1
+        hist_v[v[0]] += 1
+        cell = cells[h[0]][v[0]]
+        cell[0 if h > v else 1 if h == v else 2] += 1
+
+    expected = [[[w, t, w + t + l] for w, t, l in row] for row in cells]
+    plain = equity_hu_exact(hero, villain, board)
+    variants = [{}, {"symmetry": False}]
+    try:
+        import numpy  # noqa: F401
+        variants.append({"vectorized": True})
+    except ImportError:
+        pass
+    for kwargs in variants:
+        res = equity_hu_exact(hero, villain, board, categories=True, **kwargs)
+        assert {k: res[k] for k in plain} == plain
+        assert res["hero_categories"] == hist_h
+        assert res["villain_categories"] == hist_v
+        assert res["category_matrix"] == expected
@@ -0,0 +1,47 @@
+import random
+import pytest
+from cards import parse_card
+from equity_hu import equity_hu_exact
+from equity_multiway import equity_multiway
+
+def H(*ss):
+    return [parse_card(s) for s in ss]
+
+def test_two_players_matches_heads_up():
+    hero, vill, board = H("Ah","Qh"), H("Jd","9d"), H("Jh","7c","2h")
+    res = equity_multiway([hero, vill], board)
+    hu = equity_hu_exact(hero, vill, board)
+    assert res["exact"] and res["total"] == hu["total"]
+    assert res["players"][0]["wins"] == hu["wins"]
+    assert res["players"][0]["ties"] == hu["ties"]
+    assert res["players"][0]["equity"] == pytest.approx(hu["equity"])
+
+def test_three_way_split_pot():
+    # everyone plays the board royal flush
+    res = equity_multiway([H("2c","3d"), H("4s","5c"), H("6d","7d")], H("Ah","Kh","Qh","Jh","Th"))
+    assert res["total"] == 1
+    for p in res["players"]:
+        assert p["equity"] == pytest.approx(1 / 3)
+        assert p["wins"] == 0 and p["ties"] == 1
+
+def test_four_way_turn_equities_sum_to_one():
+    holes = [H("Ah","Kh"), H("Qs","Qd"), H("Jc","Tc"), H("7s","7d")]
+    res = equity_multiway(holes, H("Qh","8h","9c","2s"))
+    assert res["exact"] and res["total"] == 52 - 8 - 4
+    assert sum(p["equity"] for p in res["players"]) == pytest.approx(1.0)
+
+def test_sampled_when_large_and_reproducible():
+    holes = [H("As","Ad"), H("Kh","Kd"), H("Qc","Js")]
+    r1 = equity_multiway(holes, [], samples=2000, rng=random.Random(9))
+    r2 = equity_multiway(holes, [], samples=2000, rng=random.Random(9))
+    assert not r1["exact"] and r1["total"] == 2000
+    assert r1 == r2
+    assert r1["players"][0]["equity"] > r1["players"][1]["equity"]
+
+def test_bad_inputs():
+    with pytest.raises(ValueError):
+        equity_multiway([H("As","Ad")], [])
+    with pytest.raises(ValueError):
+        equity_multiway([H("As","Ad"), H("As","Kd")], [])
+    with pytest.raises(ValueError):
+        equity_multiway([H("As","Ad")] + [H("Kh","Kd")] * 9, [])
@@ -0,0 +1,85 @@
+import pytest
+from cards import parse_card
+from equity_hu import equity_hu_exact
+from equity_range import equity_combos, equity_range_vs_range, equity_hand_vs_range
+from ranges import range_to_combos
+
+def H(*ss):
+    return [parse_card(s) for s in ss]
+
+def _pairwise(hero_combos, villain_combos, board):
+    # brute force reference: one equity_hu_exact per non-conflicting matchup
+    wins = ties = total = 0
+    per = {}
+    for h in hero_combos:
+        hw = ht = hn = 0
+        for v in villain_combos:
+            if set(h) & set(v):
+                continue
+            r = equity_hu_exact(list(h), list(v), board)
+            hw += r["wins"]; ht += r["ties"]; hn += r["total"]
+        per[h] = (hw, ht, hn)
+        wins += hw; ties += ht; total += hn
+    return wins, ties, total, per
+
+def test_range_vs_range_matches_pairwise_exact():
+    board = H("Jh","7c","2h","9s")
+    hero = range_to_combos(["JJ+", "AQs"], exclude=board)
+    vill = range_to_combos(["QQ", "AK", "T8s"], exclude=board)
+    res = equity_range_vs_range(["JJ+", "AQs"], ["QQ", "AK", "T8s"], board)
+    wins, ties, total, per = _pairwise(hero, vill, board)
+    assert (res["wins"], res["ties"], res["total"]) == (wins, ties, total)
+    assert res["equity"] == pytest.approx((wins + 0.5 * ties) / total)
+    assert set(res["per_combo"]) == set(hero)
+    for combo, (w, t, n) in per.items():
+        pc = res["per_combo"][combo]
+        assert (pc["wins"], pc["ties"], pc["total"]) == (w, t, n)
+
+def test_hand_vs_range_flop_with_card_removal():
+    board = H("Ah","8s","2c")
+    hero = H("As","Kd")
+    res = equity_hand_vs_range(hero, ["AK", "88"], board)
+    vill = range_to_combos(["AK", "88"], exclude=hero + board)
+    wins, ties, total, _ = _pairwise([tuple(hero)], vill, board)
+    assert (res["wins"], res["ties"], res["total"]) == (wins, ties, total)
+
+def test_conflicting_and_board_blocked_combos():
+    board = H("Ah","Kh","Qh","Jh","Th")
+    # both hands play the board royal flush; AhAs is blocked by the board
+    res = equity_combos([tuple(H("2c","3d")), tuple(H("Ah","As"))], [tuple(H("2c","4s")), tuple(H("5s","6s"))], board)
+    assert res["total"] == 1
+    assert res["ties"] == 1 and res["equity"] == 0.5
+    assert list(res["per_combo"]) == [tuple(H("2c","3d"))]
+
+def test_refuses_large_enumeration_by_default():
+    with pytest.raises(ValueError):
+        equity_range_vs_range(["AA"], ["KK"], H("Ah","8s"))
+
+def test_equity_grid_matches_per_class_ranges():
+    from equity_range import equity_grid
+    from ranges import hand_class_index, hand_class_name
+    board = H("Jh", "7c", "2h", "3s")
+    villain = ["TT+", "AJs+", "KQo"]
+    res = equity_grid(villain, board)
+    assert res["combos"] == 48 * 47 // 2  # every combo without a board card
+
+    for hand in ["AA", "AKs", "72o", "JTs", "33", "KQo"]:
+        i = hand_class_index(*range_to_combos([hand])[0])
+        cell = res["grid"][i // 13][i % 13]
+        assert cell["hand"] == hand_class_name(i) == hand
+        ref = equity_range_vs_range([hand], villain, board)
+        assert (cell["wins"], cell["ties"], cell["total"]) == (ref["wins"], ref["ties"], ref["total"])
+        assert cell["equity"] == pytest.approx(ref["equity"])
+        assert cell["combos"] == len(range_to_combos([hand], exclude=board))
+
+def test_equity_grid_hero_range_and_weights():
+    from equity_range import equity_grid
+    board = H("Jh", "7c", "2h", "3s")
+    res = equity_grid(["QQ+"], board, hero_range=["AKs", "99:0.5"])
+    cells = [c for row in res["grid"] for c in row if c is not None]
+    assert sorted(c["hand"] for c in cells) == ["99", "AKs"]
+    assert res["combos"] == 10 and res["weight"] == pytest.approx(4 + 3)
+    by_hand = {c["hand"]: c for c in cells}
+    points = {h: c["wins"] + 0.5 * c["ties"] for h, c in by_hand.items()}
+    expected = (points["AKs"] + 0.5 * points["99"]) / (by_hand["AKs"]["total"] + 0.5 * by_hand["99"]["total"])
+    assert res["equity"] == pytest.approx(expected)
@@ -0,0 +1,55 @@
+import asyncio
+from cards import parse_cards
+from equity_hu import equity_hu_exact
+from equity_range import equity_range_vs_range
+from equity_service import EquityService, EquityClient
+from loadgen import make_spots, run_load
+
+def _exact(spot):
+    return equity_hu_exact(parse_cards(spot["hero"]), parse_cards(spot["villain"]), parse_cards(spot["board"]), allow_large=True)
+
+def test_submit_batches_and_matches_exact():
+    spots = make_spots(40, boards=3, seed=7)
+
+    async def run():
+        service = await EquityService(workers=0, batch_delay=0.01).start(port=None)
+        try:
+            res = await asyncio.gather(*(service.submit({"id": i, **s}) for i, s in enumerate(spots)))
+            bad = await service.submit({"id": "x", "hero": "AhAh", "villain": "KsKd", "board": "2c3d4h"})
+            metrics = await service.submit({"op": "metrics"})
+        finally:
+            await service.close()
+        return res, bad, metrics
+
+    res, bad, metrics = asyncio.run(run())
+    assert [r["id"] for r in res] == list(range(40))
+    for spot, r in zip(spots, res):
+        assert {k: r[k] for k in ("equity", "wins", "ties", "total")} == _exact(spot)
+    assert bad["id"] == "x" and "error" in bad
+    assert metrics["requests"] == 41 and metrics["errors"] == 1
+    assert metrics["batches"] < 40 and metrics["mean_batch"] > 1
+
+def test_socket_client_and_load_generator():
+    async def run():
+        service = await EquityService(workers=0).start(port=0)
+        host, port = service.address[:2]
+        try:
+            client = await EquityClient.connect(host, port)
+            heavy = await client.equity("AhKh", "QsQd", "2c7d")
+            rng = await client.range_equity("QQ+", "AK, 88", "Jh7c2h9s")
+            unknown = await client.request({"op": "nope"})
+            malformed = await asyncio.wait_for(client.request({"op": "range", "hero_range": 5, "villain_range": "AK", "board": "Jh7c2h9s"}), 10)
+            await client.close()
+            report = await run_load(make_spots(60, seed=3), concurrency=8, host=host, port=port, connections=2)
+        finally:
+            await service.close()
+        return heavy, rng, unknown, malformed, report
+
+    heavy, rng, unknown, malformed, report = asyncio.run(run())
+    assert {k: heavy[k] for k in ("equity", "wins", "ties", "total")} == _exact({"hero": "AhKh", "villain": "QsQd", "board": "2c7d"})
+    expected = equity_range_vs_range("QQ+", "AK, 88", parse_cards("Jh7c2h9s"))
+    assert rng["wins"] == expected["wins"] and rng["total"] == expected["total"]
+    assert "error" in unknown
+    assert "error" in malformed
+    assert report["requests"] == 60 and report["errors"] == 0
+    assert report["service"]["requests"] >= 63 and report["service"]["errors"] >= 2
@@ -0,0 +1,52 @@
+import pstats
+import instrument
+from cards import parse_card
+from equity_hu import enumerate_runouts, equity_hu_exact, equity_hu_mc
+from hand_rank7 import rank7
+
+def H(*ss):
+    return [parse_card(s) for s in ss]
+
+SPOT = (H("Ah","Qh"), H("Jd","9d"), H("Jh","7c","2h"))
+
+def test_off_by_default_and_restored():
+    assert instrument.active is None
+    with instrument.collect() as stats:
+        assert instrument.active is stats
+        with instrument.collect() as inner:
+            assert instrument.active is inner
+        assert instrument.active is stats
+    assert instrument.active is None
+
+def test_counts_and_phases_for_exact_equity():
+    with instrument.collect() as stats:
+        res = equity_hu_exact(*SPOT, symmetry=False)
+    c, t = stats.counters, stats.timings
+    assert c["runouts_scored"] == c["runouts_total"] == res["total"] == 990
+    assert c["rank7"] == 2 * 990
+    assert set(t) >= {"validate", "deck", "enumerate", "evaluate"}
+    assert t["evaluate"] <= t["enumerate"]
+
+def test_symmetry_weights_show_up_and_callback_fires():
+    seen = []
+    with instrument.collect(callback=seen.append):
+        enumerate_runouts(H("As","Ks"), H("Qs","Js"), H("2s","7d","7c"))
+    (stats,) = seen
+    assert stats.counters["runouts_total"] == 990
+    assert stats.counters["runouts_scored"] < 990
+
+def test_rank5_and_rank7_counters():
+    with instrument.collect() as stats:
+        rank7(H("Ah","Kh","Qh","Jh","Th","2c","3d"), evaluator="reference")
+        equity_hu_mc(*SPOT, max_samples=50, check_every=10)
+    assert stats.counters["rank5"] == 21
+    assert stats.counters["rank7"] == 1 + 2 * 50
+    assert stats.counters["runouts_scored"] == 50
+
+def test_profile_call_writes_pstats(tmp_path):
+    path = tmp_path / "eq.pstats"
+    res, stats, _ = instrument.profile_call(equity_hu_exact, *SPOT, path=str(path))
+    assert res["total"] == 990
+    assert stats.counters["runouts_total"] == 990
+    names = {fn[2] for fn in pstats.Stats(str(path)).stats}
+    assert "rank7_ints" in names
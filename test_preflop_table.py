@@ -0,0 +1,102 @@
+from array import array
+import pytest
+from cards import parse_card, card_to_int, combo_index, NUM_COMBOS
+from equity_hu import equity_hu_exact, set_preflop_table
+from preflop_table import PreflopTable, write_table, classes_from_combos, MISSING, RUNOUTS
+from ranges import hand_class_index
+
+def H(*ss):
+    return [parse_card(s) for s in ss]
+
+def _idx(hole):
+    return combo_index(card_to_int(hole[0]), card_to_int(hole[1]))
+
+@pytest.fixture
+def exact_table(tmp_path):
+    # synthetic counts for one matchup in both directions, everything else missing
+    hero, vill = H("As","Kd"), H("Qh","Qs")
+    wins = array("I", [MISSING]) * (NUM_COMBOS * NUM_COMBOS)
+    ties = array("I", [MISSING]) * (NUM_COMBOS * NUM_COMBOS)
+    h, v = _idx(hero), _idx(vill)
+    wins[h * NUM_COMBOS + v], ties[h * NUM_COMBOS + v] = 1000, 20
+    wins[v * NUM_COMBOS + h], ties[v * NUM_COMBOS + h] = RUNOUTS - 1020, 20
+    class_eq, class_weight = classes_from_combos(wins, ties)
+    path = tmp_path / "pf.bin"
+    write_table(str(path), class_eq, class_weight, wins, ties)
+    table = PreflopTable(str(path))
+    yield table
+    table.close()
+
+def test_lookup_and_class_grid(exact_table):
+    hero, vill = H("As","Kd"), H("Qh","Qs")
+    res = exact_table.lookup(hero, vill)
+    assert res == {"equity": (1000 + 10) / RUNOUTS, "wins": 1000, "ties": 20, "total": RUNOUTS}
+    # card order inside a hand doesn't matter
+    assert exact_table.lookup(hero[::-1], vill[::-1]) == res
+    assert exact_table.lookup(vill, hero)["wins"] == RUNOUTS - 1020
+    assert exact_table.lookup(H("Ah","Ad"), vill) is None
+    eq, n = exact_table.class_equity(hand_class_index(*hero), hand_class_index(*vill))
+    assert n == 1 and eq == pytest.approx(res["equity"])
+
+def test_equity_hu_exact_uses_table(exact_table):
+    hero, vill = H("As","Kd"), H("Qh","Qs")
+    set_preflop_table(exact_table)
+    try:
+        # answered from the table (synthetic counts), under the same allow_large rule as an enumeration
+        assert equity_hu_exact(hero, vill, [], allow_large=True)["wins"] == 1000
+        # without allow_large both stored and missing matchups are refused
+        with pytest.raises(ValueError):
+            equity_hu_exact(hero, vill, [])
+        with pytest.raises(ValueError):
+            equity_hu_exact(H("Ah","Ad"), vill, [])
+        with pytest.raises(ValueError):
+            equity_hu_exact(hero, H("As","Qs"), [], allow_large=True)
+    finally:
+        set_preflop_table(None)
+
+def test_class_only_table(tmp_path):
+    path = tmp_path / "classes.bin"
+    write_table(str(path), [0.5] * (169 * 169), [1] * (169 * 169))
+    with PreflopTable(str(path)) as table:
+        assert not table.exact
+        assert table.lookup(H("As","Kd"), H("Qh","Qs")) is None
+        assert table.class_equity(0, 1)[0] == 0.5
+
+def test_rejects_bad_file(tmp_path):
+    path = tmp_path / "bad.bin"
+    path.write_bytes(b"nope" * 8)
+    with pytest.raises(ValueError):
+        PreflopTable(str(path))
+
+def test_build_table_shares_canonical_counts_and_mirrors(tmp_path, monkeypatch):
+    import preflop_table
+    from equity_hu import enumerate_runouts
+    from hand_rank7 import np
+    hero, vill = H("As","Kd"), H("Qh","Qs")
+    wins, ties = 736811, 7226  # enumerate_runouts(hero, vill, [], allow_large=True)
+    # the same matchup with suits relabeled (s -> c, d -> h, h -> d)
+    hero2, vill2 = H("Ac","Kh"), H("Qd","Qc")
+    h, v = _idx(hero), _idx(vill)
+
+    calls = []
+    def count(key):
+        # stands in for the real enumeration, counts are per canonical (low index, high index) matchup
+        calls.append(key)
+        if key == preflop_table._canonical_matchup(h, v):
+            return key, wins, ties
+        assert key == preflop_table._canonical_matchup(v, h)
+        return key, RUNOUTS - wins - ties, ties
+    monkeypatch.setattr(preflop_table, "_count_matchup", count)
+
+    path = str(tmp_path / "pf.bin")
+    preflop_table.build_table(path, matchups=[(h, v), (_idx(vill2), _idx(hero2))])
+    assert len(calls) == 1
+
+    with PreflopTable(path) as table:
+        assert table.lookup(hero, vill)["wins"] == wins
+        assert table.lookup(hero2, vill2)["wins"] == wins
+        # mirrored cell, checked against a real enumeration of villain's side
+        ref = enumerate_runouts(vill2, hero2, [], allow_large=True, vectorized=np is not None)
+        got = table.lookup(vill2, hero2)
+        assert (got["wins"], got["ties"], got["total"]) == (ref["wins"], ref["ties"], ref["total"])
+        assert table.lookup(hero, H("Jh","Js")) is None
@@ -45,4 +45,80 @@ def test_blockers_remove_specific_combos():
     card_str((r1, s1)) + card_str((r2, s2))
     for ((r1, s1), (r2, s2)) in combos
     )
-    assert "AdQd" in as_strs and "AcQc" in as_strs
\ No newline at end of file
+    assert "AdQd" in as_strs and "AcQc" in as_strs
+
+def test_hand_class_grid():
+    from itertools import combinations
+    from collections import Counter
+    from cards import make_deck
+    from ranges import hand_class_index, hand_class_name
+    assert hand_class_name(hand_class_index(*C("As","Ad"))) == "AA"
+    assert hand_class_name(hand_class_index(*C("Ks","As"))) == "AKs"
+    assert hand_class_name(hand_class_index(*C("As","Kd"))) == "AKo"
+    assert hand_class_name(hand_class_index(*C("2c","2d"))) == "22"
+    counts = Counter(hand_class_index(a, b) for a, b in combinations(make_deck(), 2))
+    assert len(counts) == 169
+    for idx, n in counts.items():
+        name = hand_class_name(idx)
+        assert len(range_to_combos([name])) == n
+
+def test_compiled_range_matches_range_to_combos():
+    from ranges import Range
+    tokens = ["22+", "A9s+", "KTs+", "AQ+", "76o"]
+    board = C("As","Qh","7d")
+    r = Range.from_tokens(tokens)
+    assert len(r) == len(range_to_combos(tokens))
+    as_sets = lambda combos: {frozenset(c) for c in combos}
+    assert as_sets(r.without(board).combos()) == as_sets(range_to_combos(tokens, exclude=board))
+    assert len(r.without(board)) == len(range_to_combos(tokens, exclude=board))
+
+def test_compiled_range_set_ops_and_weights():
+    from ranges import Range
+    pairs = Range.from_tokens(["TT+"])
+    broad = Range.from_tokens(["QQ+", "AK"])
+    assert len(pairs | broad) == 30 + 16
+    assert (pairs & broad).to_tokens() == ["AA", "KK", "QQ"]
+    assert (broad - pairs).to_tokens() == ["AKs", "AKo"]
+
+    half = Range.from_tokens(["AK"], weight=0.5)
+    assert len(half) == 16 and half.weight_total() == 8.0
+    mixed = half | Range.from_tokens(["AKs"])
+    assert mixed.weight(*C("Ah","Kh")) == 1.0
+    assert mixed.weight(*C("Ah","Kd")) == 0.5
+    assert mixed.weight_total() == 4 + 6.0
+    assert (half & Range.from_tokens(["AKs"])).weight_total() == 2.0
+    assert mixed.without(C("Ah")).weight_total() == 3 + 4.5
+
+def test_compiled_range_tokens_round_trip():
+    from ranges import Range
+    r = Range.from_tokens(["JJ+", "AQs"]).without(C("Ad","Jc"))
+    tokens = r.to_tokens()
+    assert "QQ" in tokens and "AQs" not in tokens and "AhQh" in tokens
+    assert Range.from_tokens(tokens) == r
+    assert tuple(C("As","Qs")) in r and tuple(C("Ad","Qd")) not in r
+    with pytest.raises(ValueError):
+        parse_range_tokens(["AhAh"])
+
+def test_extended_syntax():
+    from ranges import compile_range
+    assert compile_range("22-77").to_tokens() == ["77", "66", "55", "44", "33", "22"]
+    assert compile_range("K7s-KTs") == compile_range("KTs, K9s, K8s, K7s")
+    assert compile_range("T9s-76s") == compile_range(["T9s", "98s", "87s", "76s"])
+    assert len(compile_range("AQo-AJo")) == 24
+    assert len(compile_range("random")) == 1326
+    ak = compile_range("AK:0.5, AKs")
+    assert len(ak) == 16 and ak.weight_total() == 4 + 6.0
+    assert compile_range(ak.to_tokens()) == ak
+    assert len(range_to_combos(["AK:0.25", "22-33"])) == 16 + 12
+    for bad in ["22-AKs", "KTs-Q7s", "AKs-AKo", "22+-55", "AK:0", "AK:1.5", "AK:x"]:
+        with pytest.raises(ValueError):
+            compile_range(bad)
+
+def test_compiled_ranges_are_cached():
+    from ranges import compile_range, clear_range_cache, range_cache_info
+    clear_range_cache()
+    first = compile_range("QQ+, AKs, KTs-K7s")
+    assert compile_range(["KTs-K7s", "AKs", "QQ+", "AKs"]) is first
+    assert compile_range("  AKs,KTs-K7s   QQ+") is first
+    info = range_cache_info()
+    assert info.misses == 1 and info.hits == 2
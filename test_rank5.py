@@ -1,3 +1,4 @@
+import os
 import pytest
 from cards import parse_card
 from hand_rank5 import rank5
@@ -91,4 +92,61 @@ def test_category_ordering_sanity():
     twop = rank5(H("Jc","Jd","4s","4h","9d"))
     onep = rank5(H("9c","9d","Ah","Kd","2s"))
     high = rank5(H("Ah","Kd","9s","5c","3d"))
-    assert sf > quad > full > flsh > strt > tri > twop > onep > high
\ No newline at end of file
+    assert sf > quad > full > flsh > strt > tri > twop > onep > high
+
+def test_lookup_matches_reference_on_random_hands():
+    import random
+    from cards import make_deck
+    from hand_rank5 import rank5_reference, rank5_value, strength_to_tuple
+    rng = random.Random(14)
+    deck = make_deck()
+    for _ in range(5000):
+        hand = rng.sample(deck, 5)
+        r = rank5(hand)
+        assert r == rank5_reference(hand)
+        assert strength_to_tuple(rank5_value(hand)) == r
+
+def test_rank5_value_orders_like_tuples():
+    from hand_rank5 import rank5_value, strength_of
+    hands = [H("9h","Th","Jh","Qh","Kh"), H("Ah","Ad","Ac","As","2h"), H("Kh","Kd","Kc","2s","2d"),
+             H("As","Ts","8s","4s","2s"), H("Ad","2s","3h","4c","5d"), H("Jc","Jd","4s","4h","9d"),
+             H("Ah","Kd","9s","5c","3d"), H("7c","5d","4h","3s","2d")]
+    values = [rank5_value(h) for h in hands]
+    assert values == sorted(values, reverse=True)
+    assert values[-1] == 0
+    assert rank5_value(H("Ah","Kh","Qh","Jh","Th")) == 7461
+    assert [strength_of(rank5(h)) for h in hands] == values
+
+def test_impossible_hand_rejected():
+    # five of one rank has no class
+    with pytest.raises(ValueError):
+        rank5([(14, "h"), (14, "d"), (14, "c"), (14, "s"), (14, "h")])
+
+@pytest.mark.skipif(not os.environ.get("POKERVISION_EXHAUSTIVE"), reason="set POKERVISION_EXHAUSTIVE=1 to check all 2,598,960 hands")
+def test_lookup_matches_reference_exhaustive():
+    from itertools import combinations
+    from cards import make_deck
+    from hand_rank5 import rank5_reference
+    seen = set()
+    n = 0
+    for five in combinations(make_deck(), 5):
+        hand = list(five)
+        r = rank5(hand)
+        assert r == rank5_reference(hand), hand
+        seen.add(r)
+        n += 1
+    assert n == 2_598_960
+    assert len(seen) == 7462
+
+def test_packed_values_round_trip_and_order():
+    from hand_rank5 import pack_hand, unpack_hand, strength_to_tuple
+    classes = [strength_to_tuple(i) for i in range(7462)]
+    packed = [pack_hand(t) for t in classes]
+    assert packed == sorted(packed) and len(set(packed)) == 7462
+    assert all(unpack_hand(p) == t for p, t in zip(packed, classes))
+    assert max(packed) < 1 << 24
+    hand = H("Kh","Kd","Kc","2s","2d")
+    assert rank5(hand, packed=True) == pack_hand(rank5(hand)) == 0x6D2000
+    for bad in [(), (9, 5), (4, 14, 2), (0, 14, 13, 12, 11, 1)]:
+        with pytest.raises(ValueError):
+            pack_hand(bad)
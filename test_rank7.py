@@ -52,4 +52,124 @@ def test_category_ordering_against_another_hand():
     rB = rank7(handB)
     assert rA[0] == 5          # flush
     assert rB[0] == 2          # two pair
-    assert rA > rB
\ No newline at end of file
+    assert rA > rB
+
+def test_table_matches_reference_on_random_hands():
+    import random
+    from cards import make_deck
+    rng = random.Random(7)
+    deck = make_deck()
+    for _ in range(3000):
+        cards = rng.sample(deck, 7)
+        assert rank7(cards, evaluator="table") == rank7(cards, evaluator="reference")
+
+def test_evaluator_switch():
+    from hand_rank7 import set_evaluator, get_evaluator
+    cards = H("Ah","Kh","8h","4h","2h","Qh","9c")
+    assert get_evaluator() == "table"
+    set_evaluator("reference")
+    try:
+        assert rank7(cards) == (5, 14, 13, 12, 8, 4)
+    finally:
+        set_evaluator("table")
+    with pytest.raises(ValueError):
+        set_evaluator("nope")
+    with pytest.raises(ValueError):
+        rank7(cards, evaluator="nope")
+
+def test_strength_roundtrip_and_order():
+    from hand_rank7 import strength_of, strength_to_tuple
+    assert strength_to_tuple(0) == (0, 7, 5, 4, 3, 2)
+    assert strength_to_tuple(7461) == (8, 14)
+    for s in range(0, 7462, 97):
+        assert strength_of(strength_to_tuple(s)) == s
+    assert strength_of((5, 14, 13, 12, 8, 4)) > strength_of((4, 14))
+    with pytest.raises(ValueError):
+        strength_of((9, 1))
+
+def test_rank7_batch_matches_rank7():
+    np = pytest.importorskip("numpy")
+    import random
+    from cards import make_deck, cards_to_ints
+    from hand_rank7 import rank7_batch, strength_of
+    rng = random.Random(11)
+    deck = make_deck()
+    hands = [rng.sample(deck, 7) for _ in range(2000)]
+    hands.append(H("Ah","Kh","Qh","Jh","Th","2c","3d"))
+    arr = np.array([cards_to_ints(h) for h in hands], dtype=np.int8)
+    vals = rank7_batch(arr)
+    assert vals.shape == (len(hands),)
+    assert list(vals) == [strength_of(rank7(h)) for h in hands]
+
+def test_rank7_batch_rejects_bad_input():
+    np = pytest.importorskip("numpy")
+    from hand_rank7 import rank7_batch
+    with pytest.raises(ValueError):
+        rank7_batch(np.zeros((3, 6), dtype=np.int8))
+    with pytest.raises(ValueError):
+        rank7_batch(np.array([[0, 1, 2, 3, 4, 5, 52]]))
+    with pytest.raises(ValueError):
+        rank7_batch(np.array([[0, 1, 2, 3, 4, 5, 5]]))
+
+def test_rank_board_combos_matches_rank7():
+    from hand_rank7 import rank_board_combos, strength_of
+    from ranges import range_to_combos
+    for board in (H("Ah","Kh","8h","4c","2h"), H("9h","9d","9s","5c","2d"), H("5c","6d","7h","8s","Kc")):
+        res = rank_board_combos(board)
+        assert len(res["combos"]) == 1081
+        for combo, val, s in zip(res["combos"], res["values"], res["strength"]):
+            assert val == rank7(list(combo) + board)
+            assert s == strength_of(val)
+        strengths = [res["strength"][i] for i in res["order"]]
+        assert strengths == sorted(strengths, reverse=True)
+
+    board = H("Ah","Kh","8h","4c","2h")
+    combos = range_to_combos(["AA", "QJs"])
+    res = rank_board_combos(board, combos)
+    # AhAx combos are blocked by the board
+    assert len(res["combos"]) == 3 + 4
+    best = res["combos"][res["order"][0]]
+    assert best == tuple(H("Qh","Jh"))
+    with pytest.raises(ValueError):
+        rank_board_combos(board[:4])
+
+def test_rank_completions_matches_rank7():
+    import random
+    from cards import make_deck, card_to_int, int_to_card
+    from hand_rank7 import rank_completions_ints
+    rng = random.Random(19)
+    deck = make_deck()
+    hands = [H("Ah","Kh","Qh","Jh","Th","2c"), H("2h","5h","9h","Kh","3c","4d"), H("7s","7d","7c","2s","2d","9s")]
+    hands += [rng.sample(deck, 6) for _ in range(30)]
+    for six in hands:
+        ints = [card_to_int(c) for c in six]
+        rest = [i for i in range(52) if i not in ints]
+        vals = rank_completions_ints(ints, rest)
+        assert vals == [rank7(six + [int_to_card(c)]) for c in rest]
+
+def test_packed_output_matches_tuples():
+    import random
+    from cards import make_deck, card_to_int
+    from hand_rank5 import pack_hand
+    from hand_rank7 import rank7_ints, rank_combos_ints, rank_completions_ints
+    rng = random.Random(21)
+    deck = make_deck()
+    for _ in range(500):
+        seven = rng.sample(deck, 7)
+        ints = [card_to_int(c) for c in seven]
+        assert rank7(seven, packed=True) == pack_hand(rank7(seven))
+        assert rank7(seven, evaluator="reference", packed=True) == pack_hand(rank7(seven))
+        assert rank7_ints(ints, packed=True) == pack_hand(rank7(seven))
+        assert rank_combos_ints(ints[2:], [ints[:2]], packed=True) == [pack_hand(rank7(seven))]
+        assert rank_completions_ints(ints[1:], ints[:1], packed=True) == [pack_hand(rank7(seven))]
+
+def test_rank7_batch_packed():
+    np = pytest.importorskip("numpy")
+    from hand_rank5 import pack_hand
+    from hand_rank7 import rank7_batch
+    from cards import int_to_card
+    rng = np.random.default_rng(21)
+    arr = np.array([rng.permutation(52)[:7] for _ in range(300)])
+    out = rank7_batch(arr, packed=True)
+    assert out.dtype == np.int32
+    assert list(out) == [pack_hand(rank7([int_to_card(int(c)) for c in row])) for row in arr]
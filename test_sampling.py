@@ -0,0 +1,38 @@
+import random
+from collections import Counter
+import pytest
+from cards import cards_to_mask, parse_card_int
+from sampling import sample_runouts, sample_runouts_array
+
+EXCLUDE = cards_to_mask([parse_card_int(s) for s in ("Ah", "Qh", "Jd", "Js", "Jh", "7c", "2h")])
+
+def test_python_sampler_draws_distinct_live_cards():
+    draws = sample_runouts(EXCLUDE, 5, 2000, rng=random.Random(1))
+    assert len(draws) == 2000
+    for d in draws:
+        assert len(set(d)) == 5
+        assert not cards_to_mask(d) & EXCLUDE
+    assert draws == sample_runouts(EXCLUDE, 5, 2000, rng=random.Random(1))
+    # every live card shows up about equally often (45 cards, 10000 slots)
+    counts = Counter(c for d in draws for c in d)
+    assert len(counts) == 45
+    assert min(counts.values()) > 150 and max(counts.values()) < 300
+
+def test_python_sampler_edge_cases():
+    assert sample_runouts(EXCLUDE, 0, 3) == [(), (), ()]
+    assert sample_runouts(EXCLUDE, 2, 0) == []
+    with pytest.raises(ValueError):
+        sample_runouts(EXCLUDE, 46, 1)
+
+def test_numpy_sampler():
+    np = pytest.importorskip("numpy")
+    arr = sample_runouts_array(EXCLUDE, 5, 5000, rng=7)
+    assert arr.shape == (5000, 5)
+    srt = np.sort(arr, axis=1)
+    assert not (srt[:, 1:] == srt[:, :-1]).any()
+    assert not any(EXCLUDE >> int(c) & 1 for c in np.unique(arr))
+    assert (arr == sample_runouts_array(EXCLUDE, 5, 5000, rng=np.random.default_rng(7))).all()
+    counts = np.bincount(arr.ravel(), minlength=52)
+    live = counts[counts > 0]
+    assert len(live) == 45 and live.min() > 450 and live.max() < 680
+    assert sample_runouts_array(EXCLUDE, 2, 0, rng=1).shape == (0, 2)
@@ -0,0 +1,62 @@
+import math
+import random
+from itertools import combinations
+import pytest
+from cards import parse_card, parse_card_int, make_deck_ints, cards_to_mask
+from equity_hu import enumerate_runouts
+from suit_iso import SUIT_PERMS, canonical_spot, canonical_runouts, relabel, symmetry_factor
+
+def H(*ss):
+    return [parse_card(s) for s in ss]
+
+def I(*ss):
+    return [parse_card_int(s) for s in ss]
+
+def _deck(groups):
+    return make_deck_ints(cards_to_mask([c for g in groups for c in g]))
+
+def test_canonical_spot_ignores_suit_labels_and_order():
+    groups = (I("As","Kd"), I("Qh","Qs"), I("Jh","7c","2h"))
+    key = canonical_spot(groups)
+    rng = random.Random(4)
+    for perm in SUIT_PERMS:
+        moved = [[relabel(c, perm) for c in g] for g in groups]
+        for g in moved:
+            rng.shuffle(g)
+        assert canonical_spot(moved) == key
+    # a different spot gets a different key
+    assert canonical_spot((I("As","Ks"), I("Qh","Qs"), I("Jh","7c","2h"))) != key
+
+@pytest.mark.parametrize("spot,need", [
+    ((("As","Ks"), ("Qs","Js"), ("2s",)), 2),
+    ((("As","Ks"), ("Qh","Qd"), ()), 2),
+    (((), (), ()), 3),
+    ((("Ah","Kd"), ("Qc","Js"), ("2h","3d","4c")), 2),
+])
+def test_canonical_runouts_cover_every_runout_once(spot, need):
+    groups = [I(*g) for g in spot]
+    deck = _deck(groups)
+    reps = list(canonical_runouts(groups, deck, need))
+    assert sum(w for _, w in reps) == math.comb(len(deck), need)
+    assert len(reps) * symmetry_factor(groups) >= math.comb(len(deck), need)
+    # brute force orbits under the relabelings fixing the spot
+    fixing = [p for p in SUIT_PERMS if all(sorted(relabel(c, p) for c in g) == sorted(g) for g in groups)]
+    orbit_size = {}
+    for drawn in combinations(deck, need):
+        key = min(tuple(sorted(relabel(c, p) for c in drawn)) for p in fixing)
+        orbit_size[key] = orbit_size.get(key, 0) + 1
+    got = {}
+    for drawn, w in reps:
+        key = min(tuple(sorted(relabel(c, p) for c in drawn)) for p in fixing)
+        assert key not in got
+        got[key] = w
+    assert got == orbit_size
+
+def test_symmetry_keeps_exact_counts():
+    for hero, vill, board in [
+        (H("As","Ks"), H("Qs","Js"), H("2s","7d")),
+        (H("Ah","Qh"), H("Jd","9d"), H("Jh","7c","2h")),
+        (H("2c","3c"), H("2d","3d"), H("Ah","Kh","Qs")),
+    ]:
+        assert enumerate_runouts(hero, vill, board, allow_large=True, symmetry=True) == \
+            enumerate_runouts(hero, vill, board, allow_large=True, symmetry=False)